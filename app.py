@@ -1,7 +1,7 @@
 import streamlit as st
 import config as cfg
-import src
 import src.utils.general_utils.css as css
+from src.utils.aws_utils.shared import get_prefetch
 from pathlib import Path
 import os
 
@@ -30,6 +30,10 @@ def main():
     
     st.markdown(css.wide_page, unsafe_allow_html=True)
 
+    # Clients, config, exclusions and the latest offers load in the
+    # background while the first page is drawn
+    get_prefetch()
+
     src_base = find_src_path()
     
     pages = {
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+One-off backfill of the TTL expiry on EOA exclusion records.
+Enables DynamoDB TTL on the exclusions table and sets 'expires_at'
+on every non-permanent record saved before expiry was introduced.
+"""
+import argparse
+import pytz
+
+import config as cfg
+from src.utils.aws_utils.auth import LocalAuth
+from src.utils.aws_utils.dynamo_utils import Config, Exclusions
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill TTL expiry on EOA exclusion records")
+    parser.add_argument("--persistance", type=int, default=5, help="Days a non-permanent exclusion is kept")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the records that need an expiry")
+    args = parser.parse_args()
+
+    resource = LocalAuth(cfg.KEY_PATH, manual_auth=True).get_resource("dynamodb")
+    timezone = pytz.timezone(Config(resource).get_config("timezone"))
+    exclusions = Exclusions(resource, timezone)
+
+    if not args.dry_run:
+        exclusions.enable_ttl()
+
+    results = exclusions.backfill_expiry(persistance=args.persistance, dry_run=args.dry_run)
+    for provider_id, error in results["errors"].items():
+        print(f"  {provider_id}: {error}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Compares two benchmark result files and exits non-zero when an operation
+got slower than the threshold or started making more API calls.
+
+    python benchmarks/compare.py base.json head.json --threshold 0.2
+"""
+import argparse
+import json
+import sys
+
+def load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        (result["operation"], json.dumps(result["params"], sort_keys=True)): result
+        for result in data["results"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base", help="Results of the baseline commit")
+    parser.add_argument("head", help="Results of the commit under test")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative p50 slowdown")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="Ignore slowdowns on operations faster than this")
+    args = parser.parse_args()
+
+    base, head = load(args.base), load(args.head)
+    regressions = []
+
+    print(f"{'operation':<28} {'params':<22} {'base ms':>10} {'head ms':>10} {'change':>8} {'calls':>14}")
+    for key in sorted(base.keys() & head.keys()):
+        before, after = base[key], head[key]
+        base_ms = before["seconds"]["p50"] * 1000
+        head_ms = after["seconds"]["p50"] * 1000
+        change = (head_ms - base_ms) / base_ms if base_ms else 0.0
+        calls = f"{before['api_calls_total']} -> {after['api_calls_total']}"
+        print(f"{key[0]:<28} {key[1]:<22} {base_ms:>10.1f} {head_ms:>10.1f} {change:>+8.0%} {calls:>14}")
+
+        if change > args.threshold and head_ms >= args.min_ms:
+            regressions.append(f"{key[0]} {key[1]}: p50 {base_ms:.1f} -> {head_ms:.1f} ms ({change:+.0%})")
+        if after["api_calls_total"] > before["api_calls_total"]:
+            regressions.append(f"{key[0]} {key[1]}: API calls {calls}")
+
+    for key in sorted(base.keys() - head.keys()):
+        print(f"{key[0]:<28} {key[1]:<22} missing from {args.head}")
+
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the aws_utils layer against an in-process moto stand-in.
+Runs S3Handler, Config, Exclusions and the Step Functions tracker at
+several scales and writes one JSON file per run, so results can be
+compared across commits with compare.py. moto serialises requests and
+exclude_providers runs at 10-15 ms per provider, so the default
+DynamoDB scales take around ten minutes; a 100k-provider scale adds
+well over an hour. Pass smaller --providers scales for a quick check.
+
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/run_benchmarks.py --providers 1000 10000 --objects 10 100 1000
+    python benchmarks/compare.py benchmarks/results/<base>.json benchmarks/results/<head>.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+import boto3
+import moto
+import pandas as pd
+import pytz
+from moto import mock_aws
+
+import config as cfg
+from src.utils.aws_utils.dynamo_utils import TTL_ATTRIBUTE, Config, Exclusions
+from src.utils.aws_utils.s3_utils import S3Handler
+from src.utils.aws_utils.sf_utils import ExecutionTracker
+
+BUCKET = "eoa-benchmark"
+ROLE_ARN = "arn:aws:iam::123456789012:role/benchmark"
+
+
+class ApiRecorder():
+    """
+    Counts API calls and times each one through botocore's
+    before-call/after-call events, which share a per-request context.
+    """
+
+    def __init__(self, *clients) -> None:
+        self.calls = Counter()
+        self.latencies = []
+        self._lock = threading.Lock()
+        for client in clients:
+            client.meta.events.register("before-call.*.*", self._before)
+            client.meta.events.register("after-call.*.*", self._after)
+
+    def _before(self, model, context, **kwargs):
+        context["benchmark_start"] = time.perf_counter()
+        with self._lock:
+            self.calls[model.name] += 1
+
+    def _after(self, context, **kwargs):
+        start = context.get("benchmark_start")
+        if start is not None:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - start)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.latencies.clear()
+
+
+def percentile(values: list, q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def measure(recorder: ApiRecorder, operation: str, params: dict, items: int, run, setup=None, repeat: int = 3) -> dict:
+    """
+    Times 'run' over 'repeat' rounds, then runs it once more under
+    tracemalloc for peak memory, so tracing does not skew the timings.
+    'setup' is called before every round and its result passed to 'run'.
+    """
+    seconds = []
+    calls = Counter()
+    latencies = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        recorder.reset()
+        start = time.perf_counter()
+        run(state)
+        seconds.append(time.perf_counter() - start)
+        calls.update(recorder.calls)
+        latencies.extend(recorder.latencies)
+
+    state = setup() if setup else None
+    tracemalloc.start()
+    run(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    p50 = statistics.median(seconds)
+    result = {
+        "operation": operation,
+        "params": params,
+        "repeat": repeat,
+        "seconds": {
+            "min": min(seconds),
+            "p50": p50,
+            "p95": percentile(seconds, 95),
+            "max": max(seconds),
+            "mean": statistics.fmean(seconds)
+        },
+        "items": items,
+        "throughput": items / p50 if p50 > 0 else None,
+        "api_calls": {name: count // repeat for name, count in sorted(calls.items())},
+        "api_calls_total": sum(calls.values()) // repeat,
+        "api_latency_ms": {
+            "p50": (percentile(latencies, 50) or 0) * 1000,
+            "p95": (percentile(latencies, 95) or 0) * 1000,
+            "p99": (percentile(latencies, 99) or 0) * 1000
+        },
+        "peak_memory_mb": peak / 1024 ** 2
+    }
+    print(
+        f"{operation:<28} {json.dumps(params):<28} p50 {p50 * 1000:9.1f} ms  "
+        f"{result['api_calls_total']:>7} calls  {result['peak_memory_mb']:7.1f} MB"
+    )
+    return result
+
+
+def provider_ids(n: int) -> list:
+    return [f"A{i:012d}" for i in range(n)]
+
+
+def offers_frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "OFD Date": "2025-01-06",
+        "Station": [f"DX{i % 40:02d}" for i in range(rows)],
+        "Wave": "W1",
+        "Duration": [3.0 + i % 4 for i in range(rows)],
+        "Cycle": "C1",
+        "Service Type": "Standard"
+    })
+
+
+def bench_s3(s3: S3Handler, client, recorder: ApiRecorder, objects: int, repeat: int) -> list:
+    """
+    Listing, latest-object lookup, bulk download and folder moves
+    over 'objects' small CSV outputs.
+    """
+    body = offers_frame(20).to_csv(index=False).encode("utf-8")
+
+    def populate(prefix):
+        for i in range(objects):
+            client.put_object(Bucket=BUCKET, Key=f"{prefix}offers_{i:05d}.csv", Body=body)
+
+    populate(cfg.OUTPUT_PREFIX)
+    params = {"objects": objects}
+    downloads = tempfile.TemporaryDirectory(prefix="eoa-bench-")
+    results = [
+        measure(recorder, "s3.list_s3_objects", params, objects, lambda _: s3.list_s3_objects(cfg.OUTPUT_PREFIX), repeat=repeat),
+        measure(recorder, "s3.get_latest_object", params, objects, lambda _: s3.get_latest_object(cfg.OUTPUT_PREFIX), repeat=repeat),
+        measure(
+            recorder, "s3.bulk_download", params, objects,
+            lambda dest: s3.bulk_download(cfg.OUTPUT_PREFIX, dest),
+            setup=lambda: tempfile.mkdtemp(dir=downloads.name),
+            repeat=repeat
+        )
+    ]
+
+    moves = iter(range(repeat + 1))
+
+    def stage_move():
+        round_prefix = f"bench_move_{next(moves)}/"
+        populate(round_prefix + "src/")
+        return round_prefix
+
+    results.append(measure(
+        recorder, "s3.move_s3_files", params, objects,
+        lambda prefix: s3.move_s3_files(prefix + "src/", prefix + "dst/"),
+        setup=stage_move,
+        repeat=repeat
+    ))
+    downloads.cleanup()
+    return results
+
+
+def bench_s3_upload(s3: S3Handler, recorder: ApiRecorder, rows: int, repeat: int) -> list:
+    """
+    DataFrame upload and read-back at the provider scale.
+    """
+    df = offers_frame(rows)
+    params = {"rows": rows}
+    return [
+        measure(recorder, "s3.save_to_s3", params, rows, lambda _: s3.save_to_s3(df, "bench/offers.csv"), repeat=repeat),
+        measure(recorder, "s3.get_s3_object", params, rows, lambda _: s3.get_s3_object("bench/offers.csv"), repeat=repeat)
+    ]
+
+
+def bench_dynamo(resource, recorder: ApiRecorder, providers: int, repeat: int) -> list:
+    """
+    Exclusion writes, reads and wipes for 'providers' IDs,
+    plus config indexing and reads.
+    """
+    ids = provider_ids(providers)
+    exclusions = Exclusions(resource, pytz.timezone("Europe/London"))
+    config = Config(resource)
+    params = {"providers": providers}
+
+    def reset_exclusions():
+        exclusions.remove_all_exclusions(permanent=False)
+        exclusions.remove_all_exclusions(permanent=True)
+
+    def seed_exclusions():
+        # Written directly in batches, so seeding does not time the
+        # function under test once more before every round
+        reset_exclusions()
+        today = datetime.now(exclusions.timezone).strftime("%Y-%m-%d")
+        expires_at = exclusions._expiry_timestamp(today, 5)
+        with exclusions.table.batch_writer() as batch:
+            for provider_id in ids:
+                batch.put_item(Item={
+                    "provider_id": provider_id,
+                    "num_targeted": 1,
+                    "last_saved": today,
+                    "permanent": False,
+                    TTL_ATTRIBUTE: expires_at
+                })
+
+    config_values = {f"setting_{i}": i for i in range(20)}
+    rounds = iter(range(1, 2 * repeat + 3))
+
+    def next_config():
+        return {**config_values, "setting_0": next(rounds)}
+
+    return [
+        measure(recorder, "dynamo.exclude_providers", params, providers, lambda _: exclusions.exclude_providers(ids), setup=reset_exclusions, repeat=repeat),
+        measure(recorder, "dynamo.get_exclusions", params, providers, lambda _: exclusions.get_exclusions(targets_quota=1), setup=seed_exclusions, repeat=repeat),
+        measure(recorder, "dynamo.remove_all_exclusions", params, providers, lambda _: exclusions.remove_all_exclusions(), setup=seed_exclusions, repeat=repeat),
+        measure(recorder, "dynamo.index_config", {"settings": len(config_values)}, len(config_values), lambda values: config.index_config(values), setup=next_config, repeat=repeat),
+        measure(recorder, "dynamo.get_config", {"settings": len(config_values)}, len(config_values), lambda _: config.get_config(), repeat=repeat)
+    ]
+
+
+def bench_stepfunctions(client, recorder: ApiRecorder, executions: int, repeat: int, run_seconds: float = 1.0) -> list:
+    """
+    Starts 'executions' runs and tracks them until they finish. moto never
+    completes an execution on its own, so each is stopped after
+    'run_seconds'; the figure of interest is the polling cost per run.
+    """
+    arn = client.create_state_machine(
+        name=f"bench-{executions}",
+        definition=json.dumps({"StartAt": "Match", "States": {"Match": {"Type": "Pass", "End": True}}}),
+        roleArn=ROLE_ARN
+    )["stateMachineArn"]
+
+    def run(_):
+        tracker = ExecutionTracker(client, min_interval=0.1, max_interval=1.0)
+        handles = [tracker.start("match_offers", arn) for _ in range(executions)]
+        time.sleep(run_seconds)
+        for handle in handles:
+            client.stop_execution(executionArn=handle.execution_arn)
+        for handle in handles:
+            handle.wait(timeout=30)
+
+    return [measure(recorder, "sf.track_executions", {"executions": executions}, executions, run, repeat=repeat)]
+
+
+def create_tables(resource) -> None:
+    for name, key in [("eoa-exclusions", "provider_id"), ("eoa-config", "config")]:
+        resource.create_table(
+            TableName=name,
+            KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": key, "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark aws_utils against moto")
+    parser.add_argument("--providers", type=int, nargs="+", default=[1_000, 10_000], help="Provider ID scales")
+    parser.add_argument("--objects", type=int, nargs="+", default=[10, 100, 1_000, 5_000], help="S3 object scales")
+    parser.add_argument("--executions", type=int, nargs="+", default=[1, 10], help="Concurrent Step Functions runs")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed rounds per operation")
+    parser.add_argument("--only", choices=["s3", "dynamo", "sf"], nargs="+", help="Run only these groups")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+    groups = set(args.only or ["s3", "dynamo", "sf"])
+
+    results = []
+    with mock_aws():
+        s3_client = boto3.client("s3", region_name=cfg.REGION)
+        dynamo_resource = boto3.resource("dynamodb", region_name=cfg.REGION)
+        sf_client = boto3.client("stepfunctions", region_name=cfg.REGION)
+        recorder = ApiRecorder(s3_client, dynamo_resource.meta.client, sf_client)
+
+        s3_client.create_bucket(Bucket=BUCKET)
+        create_tables(dynamo_resource)
+
+        if "s3" in groups:
+            for objects in args.objects:
+                s3 = S3Handler(BUCKET, s3_client)
+                for obj in s3.list_s3_objects(""):
+                    s3_client.delete_object(Bucket=BUCKET, Key=obj["Key"])
+                results += bench_s3(s3, s3_client, recorder, objects, args.repeat)
+            for providers in args.providers:
+                results += bench_s3_upload(S3Handler(BUCKET, s3_client), recorder, providers, args.repeat)
+
+        if "dynamo" in groups:
+            for providers in args.providers:
+                results += bench_dynamo(dynamo_resource, recorder, providers, args.repeat)
+
+        if "sf" in groups:
+            for executions in args.executions:
+                results += bench_stepfunctions(sf_client, recorder, executions, args.repeat)
+
+    commit = git_commit()
+    output = args.output or str(ROOT / "benchmarks" / "results" / f"{commit or datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "commit": commit,
+                "created": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "boto3": boto3.__version__,
+                "moto": moto.__version__,
+                "pandas": pd.__version__,
+                "repeat": args.repeat
+            },
+            "results": results
+        }, f, indent=2)
+    print(f"\nWrote {len(results)} results to {output}")
+
+if __name__ == "__main__":
+    main()
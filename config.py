@@ -9,6 +9,11 @@ title = "Flex Conroller"
 page_icon = "icon.ico"
 latest_upload = None
 
+# Cold-start budget checked by import_report.py: the modules imported
+# before the first page is drawn must load within this many milliseconds.
+IMPORT_TIME_TARGETS = ["app", "src.pages.eoa.upload_page"]
+IMPORT_TIME_BUDGET_MS = 1500
+
 """
 =======================================================================================================
 AWS CONFIG
@@ -19,12 +24,30 @@ BUCKET = "uk-eoa-pipeline"
 SCHEDULING_BUCKET = "uk-flex-scheduling"
 EXCLUSION_KEY = "exclusion_dps/exclusion_dps.csv"
 SA_OUTPUTS_KEY = "SA_outputs/UK_AmFlex_SA_Output.xlsx"
+STAGING_PREFIX = "staging/"
 EOA_CONFIG = "eoa_config.json"
 OUTPUT_PREFIX = "optimized_offers/"
 SF_ARN = "arn:aws:states:us-east-1:533267382787:stateMachine:exclusive-offer-allocation"
 LAMBDA_ARN = "arn:aws:lambda:us-east-1:533267382787:function:eoa-dynamo-control"
 REGION = "us-east-1"
 DOWNLOAD_PATH = os.path.join(os.path.expanduser('~'), 'Downloads')
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+APP_DATA_DIR = os.path.join(os.getenv("LOCALAPPDATA", os.path.expanduser('~')), "FlexController")
+CACHE_DIR = os.path.join(APP_DATA_DIR, "cache")
+SF_TIMINGS_PATH = os.path.join(APP_DATA_DIR, "logs", "sf_timings.jsonl")
+S3_CACHE_MAX_BYTES = 512 * 1024 * 1024
+CONFIG_CACHE_TTL = 300
+EXCLUSION_CACHE_MAX_AGE = 3600
+PREFETCH_WORKERS = 4
+OFFERS_LISTING_TTL = 60
+RESULT_CACHE_PATH = os.path.join(CACHE_DIR, "match_results.json")
+RESULT_CACHE_MAX_AGE = 24 * 3600
+AWS_MAX_POOL_CONNECTIONS = 32
+AWS_RETRY_MODE = "adaptive"
+AWS_MAX_ATTEMPTS = 10
+AWS_CONNECT_TIMEOUT = 5
+AWS_READ_TIMEOUT = 60
 KEY_PATH = r"\\ant\dept-eu\TBA\UK\Business Analyses\CentralOPS\Scheduling\UK\FlexData\Flex_UK_AWS\flex-programatic-access_accessKeys.csv"
 
 """
@@ -49,6 +72,18 @@ sa_columns = [
     "Service Type"
 ]
 
+# Parse schema of the SA output upload, keyed by the columns above
+sa_dtypes = {
+    "OFD Date": "datetime",
+    "Station": "string",
+    "Wave": "string",
+    "Duration": "float",
+    "Cycle": "string",
+    "Service Type": "string"
+}
+sa_date_formats = ["%Y-%m-%d", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M"]
+UPLOAD_CACHE_ENTRIES = 4
+
 local_files = [
     r"\\ant\dept-eu\Amazon-Flex-Europe\EU-OE\LPnS\LPnS_Model\LPnS_Wave_Optimizer_V4.xlsm",                               # LPNS Wave Plan 
     r"\\ant.amazon.com\dept-eu\Amazon-Flex-Europe\Data\OE\AMZL\UTR Model\UTRChangeLog.xlsx",                             # UTR Buffers
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Cold-start import report for Flex Controller.
+Imports the startup modules in a fresh interpreter with '-X importtime',
+prints the most expensive modules and exits non-zero when the total
+import time goes over the budget set in config.py.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import config as cfg
+
+def run_importtime(targets: list) -> list[dict]:
+    """
+    Imports the targets in a fresh interpreter and parses the
+    '-X importtime' lines into one record per module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(targets)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError("Import failed:\n" + "\n".join(errors))
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        modules.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000
+        })
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser(description="Report module import times and check the cold-start budget")
+    parser.add_argument("targets", nargs="*", default=cfg.IMPORT_TIME_TARGETS, help="Modules imported at startup")
+    parser.add_argument("--budget-ms", type=float, default=cfg.IMPORT_TIME_BUDGET_MS, help="Maximum total import time")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to run; the fastest one is reported")
+    parser.add_argument("--top", type=int, default=20, help="Number of modules to list")
+    parser.add_argument("--json", help="Also write the per-module report to this file")
+    args = parser.parse_args()
+
+    runs = [run_importtime(args.targets) for _ in range(max(args.runs, 1))]
+    modules = min(runs, key=lambda run: sum(m["self_ms"] for m in run))
+    total_ms = sum(m["self_ms"] for m in modules)
+
+    print(f"{'self ms':>10} {'cumul ms':>10}  module")
+    for module in sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:args.top]:
+        print(f"{module['self_ms']:>10.1f} {module['cumulative_ms']:>10.1f}  {'  ' * module['depth']}{module['module']}")
+    print(f"\nTotal import time: {total_ms:.0f} ms for {len(modules)} modules (budget {args.budget_ms:.0f} ms)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"targets": args.targets, "total_ms": total_ms, "budget_ms": args.budget_ms, "modules": modules}, f, indent=2)
+
+    if total_ms > args.budget_ms:
+        print(f"FAIL: startup imports are {total_ms - args.budget_ms:.0f} ms over budget")
+        sys.exit(1)
+    print("OK: startup imports are within budget")
+
+if __name__ == "__main__":
+    main()
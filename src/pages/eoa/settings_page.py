@@ -1,24 +1,8 @@
 import streamlit as st
-import pandas as pd
-from io import StringIO
 from datetime import datetime
-import pytz
 
-import config as cfg
-from src.utils.aws_utils.dynamo_utils import Config, Exclusions
-from src.utils.aws_utils.auth import LocalAuth
-
-@st.cache_resource
-def get_auth():
-    return LocalAuth(cfg.KEY_PATH, manual_auth=True)
-
-@st.cache_resource
-def get_clients():
-    auth = get_auth()
-    return {
-        "s3_client": auth.get_client("s3"),
-        "dynamo_resource": auth.get_resource("dynamodb")
-    }
+from src.utils.aws_utils.shared import get_clients, get_config_cache, get_exclusion_cache
+from src.utils.general_utils.logging import metrics
 
 
 def Settings_Page():
@@ -27,12 +11,19 @@ def Settings_Page():
     except Exception as e:
         st.error(f"Authentication failed: {str(e)}. Please ensure your VPN is on.")
         st.stop()
-    
-    ddb_cfg = Config(clients["dynamo_resource"])
-    ddb_excl = Exclusions(clients["dynamo_resource"], pytz.timezone(ddb_cfg.get_config("timezone")))
+
+    import pytz
+    from src.utils.aws_utils.dynamo_utils import Config, Exclusions
+
+    ddb_cfg = Config(clients["dynamo_resource"], cache=get_config_cache(clients["dynamo_resource"]))
+    ddb_excl = Exclusions(
+        clients["dynamo_resource"],
+        pytz.timezone(ddb_cfg.get_config("timezone")),
+        cache=get_exclusion_cache(clients["dynamo_resource"])
+    )
 
     up_to_date = True
-    for var in ["offers_per_dp", "weekly_dp_targets", "risk_threshold", "timezone"]:    
+    for var in ["offers_per_dp", "weekly_dp_targets", "risk_threshold", "timezone", "config_version"]:    
         if var not in st.session_state:
             up_to_date = False
     if not up_to_date:
@@ -42,6 +33,7 @@ def Settings_Page():
             st.session_state.weekly_dp_targets = int(eoa_config["weekly_dp_targets"])
             st.session_state.risk_threshold = float(eoa_config["risk_threshold"])
             st.session_state.timezone = pytz.timezone(eoa_config["timezone"])
+            st.session_state.config_version = ddb_cfg.cache.version
         except Exception as e:
             st.error(f"Failed to fetch the current configuration due to : \n{e}")
 
@@ -60,17 +52,20 @@ def Settings_Page():
 
         if st.button("Save Configuration"):
             try:
-                with st.spinner("Saving configuration..."):
+                with st.spinner("Saving configuration..."), metrics.timer("settings_page.save_config"):
                     input_data = {
                         "offers_per_dp": st.session_state.offers_per_dp,
                         "weekly_dp_targets": st.session_state.weekly_dp_targets,
                         "risk_threshold": st.session_state.risk_threshold
                     }
-                    response = ddb_cfg.index_config(input_data)
+                    response = ddb_cfg.index_config(input_data, expected_version=st.session_state.config_version)
                 if response["fail"]:
-                    st.success(f"Success: {response["success"]}")
-                    st.error(f"Errors: {response["fail"]}")
+                    st.error(f"Errors: {response['error']}")
+                    del st.session_state.config_version
+                elif not response["success"]:
+                    st.info("No changes to save.")
                 else:
+                    st.session_state.config_version = response["version"]
                     st.success(f"Targetting settings saved successfully")
             except Exception as e:
                 st.error(f"Problem saving the new settings due to: \n{e}")
@@ -90,6 +85,9 @@ def Settings_Page():
 
     st.write(" ")
     st.header("Exclusions", divider="gray")
+    excluded_count = get_exclusion_cache(clients["dynamo_resource"]).cached_len()
+    if excluded_count is not None:
+        st.caption(f"{excluded_count} providers currently have exclusion records.")
 
     uploaded_file = st.file_uploader(
         label = "Exclude specific DPs from EOA targeting for the current week.",
@@ -99,24 +97,25 @@ def Settings_Page():
     
     if uploaded_file:
         try:
-            providers = pd.read_csv(uploaded_file)["provider_id"].dropna().astype(str).to_list()
-            response = ddb_excl.fully_exclude_providers(providers)
-            st.info(f"File uploaded. {response}")
+            import pandas as pd
+            with metrics.timer("settings_page.upload_exclusions"):
+                providers = pd.read_csv(uploaded_file)["provider_id"].dropna().astype(str).to_list()
+                response = ddb_excl.fully_exclude_providers(providers)
+            st.info(f"File uploaded. Excluded {len(response['success'])} providers.")
+            if response["fail"]:
+                st.error(f"Failed to exclude {len(response['fail'])} providers: {response['errors']}")
         except Exception as e:
             st.error(f"Failed to upload provider exclusions due to:\n{e}")
             st.stop()
 
-    buffer = StringIO()
-    empty_df = pd.DataFrame(columns=["provider_id"])
-    empty_df.to_csv(buffer, index=False)
-    buffer.seek(0)
+    template = "provider_id\n"
 
     col1, col2 = st.columns([1,1])
     with col1:
         st.download_button(
             label="Download CSV template",
             file_name=f"EOA_DP_Exclusions_{datetime.now().strftime('%d_%m_%Y')}.csv",
-            data=buffer.getvalue(),
+            data=template,
             mime="text/csv"
         )
 
@@ -133,7 +132,7 @@ def Settings_Page():
 
             with yes:
                 if st.button("Yes, wipe"):
-                    with st.spinner("Removing exclusions..."):
+                    with st.spinner("Removing exclusions..."), metrics.timer("settings_page.wipe_exclusions"):
                         response = ddb_excl.remove_all_exclusions()
                     st.success(f"Removed {response["success"]} excluded DPs.")
                     st.session_state.confirm_wipe = False
@@ -1,56 +1,133 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timezone
+from datetime import datetime
 
 import config as cfg
-from src.utils.general_utils.utils import verify_eoa_upload
-from src.utils.aws_utils.auth import LocalAuth
-from src.utils.aws_utils.s3_utils import S3Handler
-from src.utils.aws_utils.sf_utils import stepfunction_invoke
+from src.utils.aws_utils.shared import (
+    get_clients, get_config_cache, get_exclusion_cache, get_execution_tracker,
+    get_latest_offers, get_result_cache, get_s3_cache
+)
+from src.utils.general_utils.logging import metrics
 
-@st.cache_resource
-def get_auth():
-    return LocalAuth(cfg.KEY_PATH, manual_auth=True)
 
-@st.cache_resource
-def get_clients():
-    auth = get_auth()
-    return {
-        "sf_client": auth.get_client("stepfunctions"),
-        "s3_client": auth.get_client("s3"),
-        "s3_resource": auth.get_resource("s3"),
-    }
+def output_etags(s3) -> dict:
+    return {obj["Key"]: obj["ETag"] for obj in s3.iter_s3_objects(cfg.OUTPUT_PREFIX)}
 
 
-def EOA_Upload_Page():
-    try:
-        clients = get_clients()
-    except Exception as e:
-        st.error(f"Authentication failed: {str(e)}. Please ensure your VPN is on.")
-        st.stop()
-    
-    s3 = S3Handler(cfg.BUCKET, clients["s3_client"])
-    s3_res = S3Handler(cfg.BUCKET, clients["s3_resource"])
+def find_cached_run(s3, file_hash: str) -> dict | None:
+    """
+    Returns the earlier run of the same offers under the current config
+    and exclusions, if its outputs are still the latest ones in S3. The
+    config version is read consistently and the exclusions fully
+    re-synced, as another user may have changed either.
+    """
+    clients = get_clients()
+    config_version = get_config_cache(clients["dynamo_resource"]).config.get_version()
+    exclusion_cache = get_exclusion_cache(clients["dynamo_resource"])
+    exclusion_cache.refresh()
+    snapshot = exclusion_cache.snapshot()
+    cached = get_result_cache().get(file_hash, config_version, snapshot)
+    if cached is not None and output_etags(s3) != cached["outputs"]:
+        get_result_cache().discard(file_hash, config_version, snapshot)
+        return None
+    return cached
+
 
+def record_run(s3, file_hash: str, execution_arn: str) -> None:
+    """
+    Caches a successful run under the inputs it finished with. The
+    exclusions are fully re-synced first, as the workflow updates them.
+    """
+    clients = get_clients()
+    exclusion_cache = get_exclusion_cache(clients["dynamo_resource"])
+    exclusion_cache.refresh()
+    get_result_cache().put(
+        file_hash,
+        get_config_cache(clients["dynamo_resource"]).config.get_version(),
+        exclusion_cache.snapshot(),
+        output_etags(s3),
+        execution_arn
+    )
+
+
+@st.fragment(run_every=2)
+def execution_status(tracker, execution_arn, s3):
+    handle = tracker.get(execution_arn)
+    if handle is None or handle.status == "RUNNING":
+        elapsed = int(handle.elapsed) if handle is not None else 0
+        st.info(f"Matching offers to providers... ({elapsed // 60}m {elapsed % 60}s)")
+        if handle is not None and handle.states:
+            for record in handle.states:
+                if record["duration"] is None:
+                    st.caption(f":hourglass: {record['state']}")
+                else:
+                    st.caption(f":white_check_mark: {record['state']} ({record['duration']:.1f}s)")
+        return
+
+    del st.session_state.match_execution
+    if handle.status == "SUCCEEDED":
+        st.session_state.uploaded = True
+        get_latest_offers.clear()
+        file_hash = st.session_state.pop("match_file_hash", None)
+        if file_hash is not None:
+            try:
+                record_run(s3, file_hash, execution_arn)
+            except Exception as e:
+                print(f"Failed to cache match_offers result: {e}")
+    else:
+        st.session_state.match_error = f"Failed due to: {handle.cause}\n{handle.error}."
+    st.rerun()
+
+
+def EOA_Upload_Page():
+    # Draw the page shell first; pandas, boto3 and the AWS helpers
+    # are only imported once the page actually needs them.
     st.title("Exclusive Offer Allocation")
     uploaded_file = st.file_uploader(
         "Upload a CSV or Excel file",
         type=["csv", "xlsx", "xls"],
         accept_multiple_files=False
     )
-    
+
+    try:
+        clients = get_clients()
+    except Exception as e:
+        st.error(f"Authentication failed: {str(e)}. Please ensure your VPN is on.")
+        st.stop()
+
+    from src.utils.aws_utils.s3_utils import S3Handler
+    from src.utils.aws_utils.sf_utils import load_state_timings
+
+    s3 = S3Handler(cfg.BUCKET, clients["s3_client"], cache=get_s3_cache())
+    eoa_config = get_config_cache(clients["dynamo_resource"])
+    tracker = get_execution_tracker(clients["sf_client"])
+
+    latest_offers = get_latest_offers(clients["s3_client"])
+    if latest_offers:
+        st.caption(
+            f"Latest optimized offers: {latest_offers[0]['key'].split('/')[-1]} "
+            f"({latest_offers[0]['last_modified'].strftime('%A, %H:%M')})"
+        )
+
     if uploaded_file is not None:
+        import pandas as pd
+        import pytz
+        from src.utils.general_utils.ingest import load_upload
+        from src.utils.general_utils.validation import validate_cached
+
         try:
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
+            with metrics.timer("upload_page.parse_upload"):
+                df, digest = load_upload(uploaded_file)
         except Exception as e:
             st.error(f"Error reading file: {e}")
+            st.stop()
 
         try:
-            report = verify_eoa_upload(df)
-            latest_upload = datetime.now().strftime("%A") + ", " + datetime.now().strftime("%H:%M")
+            with metrics.timer("upload_page.validate_upload"):
+                validation = validate_cached(digest, df)
+            report = validation["summary"]
+            tz_name = eoa_config.get("timezone")
+            now = datetime.now(pytz.timezone(tz_name)) if tz_name else datetime.now()
+            latest_upload = now.strftime("%A") + ", " + now.strftime("%H:%M")
             st.success(f"Last file uploaded: {latest_upload}")
 
             st.divider()
@@ -60,10 +137,18 @@ def EOA_Upload_Page():
             st.write("File stats")
             report_df = pd.DataFrame([report]).reset_index(drop=True)
             st.dataframe(report_df)
+
+            for warning in validation["warnings"]:
+                st.warning(warning)
         except Exception as e:
             st.error(f"Error processing file: {e}")
             st.stop()
 
+        if not validation["valid"]:
+            for error in validation["errors"]:
+                st.error(error)
+            st.stop()
+
         st.divider()
         col1, _, _= st.columns(3)
 
@@ -72,9 +157,54 @@ def EOA_Upload_Page():
                 if "uploaded" not in st.session_state:
                     st.session_state.uploaded = False
                         
-                if st.button("Upload & Distribute Offers"):
-                    with st.spinner("Uploading...", show_time=True):
-                        success = s3.save_to_s3(df, cfg.SA_OUTPUTS_KEY)
+                run_clicked = st.button("Upload & Distribute Offers")
+                cached_run = find_cached_run(s3, digest) if run_clicked else None
+
+                if cached_run is not None:
+                    # Same offers, config and exclusions as a finished run: reuse its outputs
+                    st.session_state.uploaded = True
+                    st.session_state.pop("match_error", None)
+                    finished = datetime.fromtimestamp(cached_run["created"]).strftime("%A, %H:%M")
+                    st.info(f"These offers were already matched on {finished} with the same configuration and exclusions.")
+
+                elif run_clicked:
+                    with st.spinner("Uploading...", show_time=True), metrics.timer("upload_page.upload_offers"):
+                        upload_bar = st.progress(0.0, text="Uploading...")
+
+                        if uploaded_file.name.lower().endswith(".csv"):
+                            # CSV bytes go to S3 as-is, re-validated in parallel and
+                            # only promoted to the workflow's input key if they pass
+                            from src.utils.general_utils.ingest import iter_csv_batches
+                            from src.utils.general_utils.validation import validate_upload
+
+                            data = uploaded_file.getvalue()
+
+                            def report_upload(stats):
+                                upload_bar.progress(
+                                    min(stats["bytes_sent"] / len(data), 1.0) if data else 1.0,
+                                    text=f"{stats['bytes_sent'] / 1e6:.1f}/{len(data) / 1e6:.1f} MB ({stats['throughput'] / 1e6:.1f} MB/s)"
+                                )
+
+                            result = s3.upload_validated(
+                                data,
+                                cfg.SA_OUTPUTS_KEY,
+                                validate=lambda: validate_upload(iter_csv_batches(data)),
+                                staging_prefix=cfg.STAGING_PREFIX,
+                                on_progress=report_upload
+                            )
+                            success = result["promoted"]
+                            for error in result["validation"]["errors"]:
+                                st.error(error)
+                        else:
+                            # Excel uploads are converted, as the workflow reads CSV
+                            def report_upload(stats):
+                                share = stats["rows_encoded"] / stats["total_rows"] if stats["total_rows"] else 1.0
+                                upload_bar.progress(
+                                    min(share, 1.0),
+                                    text=f"{stats['rows_encoded']}/{stats['total_rows']} rows ({stats['throughput'] / 1e6:.1f} MB/s)"
+                                )
+
+                            success = s3.save_to_s3(df, cfg.SA_OUTPUTS_KEY, on_progress=report_upload)
                         if success:
                             st.session_state.upload_time = datetime.now()
                             
@@ -82,24 +212,92 @@ def EOA_Upload_Page():
                             st.error("Upload Failed.")
                             st.stop()
 
-                    # Step-Functions ECS Workflow invocation
-                    with st.spinner(text="Matching offers to providers...", show_time=True):
-                        response = stepfunction_invoke("match_offers", clients["sf_client"], cfg.SF_ARN)
-                        if response["status"] != "SUCCEEDED":
-                            st.error(f"Failed due to: {response["cause"]}\n{response["error"]}.")
-                            st.stop()
-                        else:
-                            st.session_state.uploaded = True
+                    # Step-Functions ECS Workflow invocation, tracked in the background
+                    handle = tracker.start("match_offers", cfg.SF_ARN)
+                    st.session_state.match_execution = handle.execution_arn
+                    st.session_state.match_file_hash = digest
+                    st.session_state.uploaded = False
+                    st.session_state.pop("match_error", None)
+
+                if "match_execution" in st.session_state:
+                    execution_status(tracker, st.session_state.match_execution, s3)
 
+                if "match_error" in st.session_state:
+                    st.error(st.session_state.match_error)
+
+                others = [h for h in tracker.active() if h.execution_arn != st.session_state.get("match_execution")]
+                if others:
+                    st.caption(f"{len(others)} other workflow run(s) in progress.")
+
+                timings = load_state_timings(cfg.SF_TIMINGS_PATH)
+                if timings:
+                    import pandas as pd
+                    with st.expander("Workflow state timings"):
+                        timings = pd.DataFrame(timings)
+                        timings = timings[timings["duration"].notna()]
+                        st.dataframe(
+                            timings.groupby(["command", "state"])["duration"]
+                            .describe(percentiles=[0.5, 0.9])[["count", "mean", "50%", "90%", "max"]]
+                            .round(1)
+                        )
 
                 if st.session_state.uploaded:
                     st.info("Latest Offers available to download.")
                     if st.button("Download Optimized Offers"):
-                        s3_res.bulk_download(cfg.OUTPUT_PREFIX, cfg.DOWNLOAD_PATH, clients["s3_resource"])
-                        st.success("Download Successful!")
+                        progress = st.progress(0.0, text="Downloading...")
+
+                        def report_progress(stats):
+                            share = stats["done"] / stats["total"] if stats["total"] else 1.0
+                            progress.progress(
+                                share,
+                                text=f"{stats['done']}/{stats['total']} files ({stats['throughput'] / 1e6:.1f} MB/s)"
+                            )
+
+                        with metrics.timer("upload_page.download_offers"):
+                            result = s3.bulk_download(
+                                cfg.OUTPUT_PREFIX,
+                                cfg.DOWNLOAD_PATH,
+                                clients["s3_resource"],
+                                max_workers=cfg.DOWNLOAD_WORKERS,
+                                chunk_size=cfg.DOWNLOAD_CHUNK_SIZE,
+                                on_progress=report_progress
+                            )
+                        if result["fail"]:
+                            st.error(f"Failed to download {len(result['fail'])} files: {result['fail']}")
+                        else:
+                            st.success(
+                                f"Download Successful! {len(result['success'])} new files, "
+                                f"{len(result['skipped'])} already up to date."
+                            )
 
             except Exception as e:
                 st.error(f"Section Error: {e}")
 
+    performance = metrics.to_json()
+    if performance:
+        import json
+        import pandas as pd
+        with st.expander("Performance metrics"):
+            st.dataframe(
+                pd.DataFrame.from_dict(performance, orient="index")
+                .drop(columns=["histogram"])
+                .round(3)
+            )
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button(
+                    label="Download JSON",
+                    file_name=f"eoa_metrics_{datetime.now().strftime('%d_%m_%Y_%H%M')}.json",
+                    data=json.dumps(performance, indent=2),
+                    mime="application/json"
+                )
+            with col2:
+                st.download_button(
+                    label="Download Prometheus",
+                    file_name=f"eoa_metrics_{datetime.now().strftime('%d_%m_%Y_%H%M')}.prom",
+                    data=metrics.to_prometheus(),
+                    mime="text/plain"
+                )
+
 if __name__ == "__main__":
     EOA_Upload_Page()
\ No newline at end of file
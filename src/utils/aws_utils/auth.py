@@ -1,12 +1,54 @@
 import boto3
+import threading
+from botocore.config import Config as BotoConfig
+from typing import Callable
 import config as cfg
+from src.utils.general_utils.logging import instrument
+
+
+def build_boto_config(
+        max_pool_connections: int = cfg.AWS_MAX_POOL_CONNECTIONS,
+        retry_mode: str = cfg.AWS_RETRY_MODE,
+        max_attempts: int = cfg.AWS_MAX_ATTEMPTS,
+        connect_timeout: float = cfg.AWS_CONNECT_TIMEOUT,
+        read_timeout: float = cfg.AWS_READ_TIMEOUT,
+        tcp_keepalive: bool = True
+    ) -> BotoConfig:
+    """
+    Builds the botocore config shared by every client: a connection pool
+    large enough for the threaded S3/DynamoDB helpers, adaptive retries,
+    TCP keep-alive and explicit timeouts. These retries are the only retry
+    layer for throttled and transient request errors; the helpers do not
+    retry failed calls themselves.
+    """
+    return BotoConfig(
+        region_name=cfg.REGION,
+        max_pool_connections=max_pool_connections,
+        retries={"mode": retry_mode, "max_attempts": max_attempts},
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        tcp_keepalive=tcp_keepalive
+    )
+
 
 class LocalAuth():
+    """
+    Reads the AWS keys once into a single boto3 Session and hands out
+    one cached client/resource per service, so every caller shares the
+    same connection pools instead of paying a new TLS setup each time.
+    """
 
-    def __init__(self, key_path, manual_auth=False):
+    def __init__(self, key_path, manual_auth=False, boto_config: BotoConfig = None):
         self.key_path= key_path
         self.manual_auth = manual_auth
+        self.boto_config = boto_config or build_boto_config()
+        self._session = None
+        self._clients = {}
+        self._resources = {}
+        self._lock = threading.RLock()
+        self._warm_up = None
 
+    @instrument()
     def get_keys(self):
         """
         Fetches the AWS Keys from a shared CSV file.
@@ -17,11 +59,11 @@ class LocalAuth():
                 parts = [part.strip() for part in keys.split(",")]
                 self.access_key = parts[1].split("\n")[1].strip()
                 self.secret_key = parts[2].strip()
-                
+
                 # Validate keys are not empty
                 if not self.access_key or not self.secret_key:
                     raise ValueError("AWS keys are empty or invalid in the file")
-                    
+
         except FileNotFoundError:
             raise FileNotFoundError(f"AWS keys file not found at: {self.key_path}. Check VPN connection.")
         except IndexError:
@@ -30,38 +72,66 @@ class LocalAuth():
             raise Exception(f"Failed to read AWS keys: {str(e)}")
 
 
+    @property
+    def session(self) -> boto3.Session:
+        """
+        The shared boto3 Session, created on first use. The keys file
+        is only read once, when manual authentication is enabled.
+        """
+        with self._lock:
+            if self._session is None:
+                if not self.manual_auth:
+                    self._session = boto3.Session(region_name=cfg.REGION)
+                else:
+                    self.get_keys()
+                    self._session = boto3.Session(
+                        aws_access_key_id = self.access_key,
+                        aws_secret_access_key = self.secret_key,
+                        region_name=cfg.REGION
+                    )
+            return self._session
+
+
     def get_client(self, service: str):
         """
-        Creates an AWS client using manual access and secret keys.
+        Returns the cached AWS client for a service, creating it on first use.
         """
-        if not self.manual_auth:
-            self.client = boto3.client(service, region_name=cfg.REGION)
-        
-        else:
-            self.get_keys()
-            self.client = boto3.client(
-                service,
-                aws_access_key_id = self.access_key,
-                aws_secret_access_key = self.secret_key,
-                region_name=cfg.REGION
-            )
-
-        return self.client
+        with self._lock:
+            if service not in self._clients:
+                self._clients[service] = self.session.client(service, config=self.boto_config)
+            return self._clients[service]
 
     def get_resource(self, service: str):
         """
-        Creates an AWS resource using manual access and secret keys.
+        Returns the cached AWS resource for a service, creating it on first use.
         """
-        if not self.manual_auth:
-            self.client = boto3.resource(service, region_name=cfg.REGION)
-        
-        else:
-            self.get_keys()
-            self.client = boto3.resource(
-                service,
-                aws_access_key_id = self.access_key,
-                aws_secret_access_key = self.secret_key,
-                region_name=cfg.REGION
-            )
-            
-        return self.client    
+        with self._lock:
+            if service not in self._resources:
+                self._resources[service] = self.session.resource(service, config=self.boto_config)
+            return self._resources[service]
+
+
+    def warm_up(self, probes: dict[str, Callable] = None, resources: list = None) -> threading.Thread:
+        """
+        Creates the clients and resources in a background thread and runs
+        one cheap call per service (e.g. head_bucket) so the service models
+        are loaded and the first TLS connections are open before they are
+        needed. Probe failures are only logged.
+        """
+        def run():
+            for service in resources or []:
+                try:
+                    self.get_resource(service)
+                except Exception as e:
+                    print(f"Warm-up of {service} resource failed: {e}")
+            for service, probe in (probes or {}).items():
+                try:
+                    probe(self.get_client(service))
+                except Exception as e:
+                    print(f"Warm-up of {service} client failed: {e}")
+
+        with self._lock:
+            if self._warm_up is None:
+                self._warm_up = threading.Thread(target=run, name="aws-warm-up", daemon=True)
+                self._warm_up.start()
+            return self._warm_up
@@ -0,0 +1,64 @@
+import boto3
+import threading
+import time
+
+from src.utils.aws_utils.dynamo_utils import Config
+
+
+class ConfigCache():
+    """
+    Process-wide copy of the EOA config table. Values are decoded once
+    and served from memory until the cache is invalidated by
+    Config.index_config. Every 'ttl' seconds the config version is
+    checked with one get_item and the table is only rescanned if the
+    version moved.
+    """
+
+    def __init__(self, resource: boto3, ttl: float = 300) -> None:
+        self.config = Config(resource)
+        self.ttl = ttl
+
+        self._values = None
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+
+    def values(self) -> dict:
+        """
+        Returns all config values, revalidating them if stale.
+        """
+        with self._lock:
+            if self._values is not None and time.monotonic() - self._checked_at >= self.ttl:
+                if self.config.get_version() != self._version:
+                    self._values = None
+                self._checked_at = time.monotonic()
+
+            if self._values is None:
+                self._values, self._version = self.config.read_all()
+                self._checked_at = time.monotonic()
+            return dict(self._values)
+
+
+    @property
+    def version(self) -> int:
+        """
+        Config version the cached values belong to.
+        """
+        self.values()
+        return self._version
+
+
+    def get(self, config_name: str, default=None):
+        """
+        Returns a single config value.
+        """
+        return self.values().get(config_name, default)
+
+
+    def invalidate(self) -> None:
+        """
+        Forces the next read to go back to DynamoDB.
+        """
+        with self._lock:
+            self._values = None
@@ -1,52 +1,269 @@
 import boto3
-from typing import Any
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
 from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from decimal import Decimal
+from src.utils.general_utils.logging import instrument
+
+BATCH_WRITE_SIZE = 25
+TTL_ATTRIBUTE = "expires_at"
+VERSION_KEY = "__version__"
+
+
+def decode_value(value: Any) -> Any:
+    """
+    Converts DynamoDB Decimals back to Python numbers: integers stay
+    int, anything with a fractional part (incl. 1.0) becomes float.
+    """
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, list):
+        return [decode_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: decode_value(v) for k, v in value.items()}
+    return value
+
+
+@instrument()
+def parallel_scan(resource: boto3, table_name: str, total_segments: int = 4, **scan_kwargs) -> Iterator[dict]:
+    """
+    Scans a table with Segment/TotalSegments, one worker per segment,
+    following LastEvaluatedKey until every segment is exhausted.
+    Items are yielded as soon as each page arrives.
+    """
+    client = resource.meta.client
+    pages = queue.Queue(maxsize=total_segments * 2)
+    stop = threading.Event()
+    done = object()
+
+    def put(page) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def scan_segment(segment: int) -> None:
+        kwargs = dict(scan_kwargs, TableName=table_name, Segment=segment, TotalSegments=total_segments)
+        try:
+            while True:
+                response = client.scan(**kwargs)
+                if not put(response.get("Items", [])):
+                    return
+                if "LastEvaluatedKey" not in response:
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        except Exception as e:
+            put(e)
+        finally:
+            put(done)
+
+    for segment in range(total_segments):
+        threading.Thread(target=scan_segment, args=(segment,), daemon=True).start()
+
+    try:
+        remaining = total_segments
+        while remaining:
+            page = pages.get()
+            if page is done:
+                remaining -= 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                yield from page
+    finally:
+        stop.set()
+
+
+@instrument()
+def bulk_delete(
+        resource: boto3,
+        table_name: str,
+        keys: Iterable[dict],
+        max_workers: int = 8,
+        max_attempts: int = 8
+    ) -> dict:
+    """
+    Streams keys into concurrent BatchWriteItem delete requests of up
+    to 25 keys each, retrying UnprocessedItems with backoff. Duplicate
+    keys are dropped. Returns the number of deleted and failed keys.
+    """
+    client = resource.meta.client
+    results = {"success": 0, "fail": 0}
+    in_flight = deque()
+    seen = set()
+
+    def write(batch: list) -> tuple[int, int]:
+        requests = {table_name: [{"DeleteRequest": {"Key": key}} for key in batch]}
+        for attempt in range(max_attempts):
+            response = client.batch_write_item(RequestItems=requests)
+            requests = response.get("UnprocessedItems", {})
+            if not requests:
+                return len(batch), 0
+            time.sleep(random.uniform(0, min(5.0, 0.05 * 2 ** attempt)))
+        unprocessed = len(requests.get(table_name, []))
+        return len(batch) - unprocessed, unprocessed
+
+    def collect_oldest() -> None:
+        future, size = in_flight.popleft()
+        try:
+            deleted, failed = future.result()
+            results["success"] += deleted
+            results["fail"] += failed
+        except Exception as e:
+            results["fail"] += size
+            print(e)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        batch = []
+        for key in keys:
+            identity = tuple(sorted(key.items()))
+            if identity in seen:
+                continue
+            seen.add(identity)
+            batch.append(key)
+
+            if len(batch) == BATCH_WRITE_SIZE:
+                if len(in_flight) >= max_workers * 2:
+                    collect_oldest()
+                in_flight.append((pool.submit(write, batch), len(batch)))
+                batch = []
+
+        if batch:
+            in_flight.append((pool.submit(write, batch), len(batch)))
+        while in_flight:
+            collect_oldest()
+
+    return results
+
 
 class Config():
 
-    def __init__(self, resource: boto3) -> None:
+    def __init__(self, resource: boto3, cache: Any = None) -> None:
         self.dynamodb = resource
         self.table = self.dynamodb.Table("eoa-config")
+        self.cache = cache
 
 
-    def index_config(self, input_data: dict) -> dict[list]:
+    @instrument()
+    def get_version(self) -> int:
         """
-        Adds or changes EOA config.
+        Returns the current config version with a single consistent
+        read, so consumers can detect changes without a scan.
         """
-        results = {"success": [], "fail": []}
-        items = []
+        response = self.table.get_item(
+            Key = {
+                "config": VERSION_KEY
+            },
+            ConsistentRead=True
+        )
+        return decode_value(response.get("Item", {}).get("value", 0))
+
+
+    @instrument()
+    def read_all(self) -> tuple[dict, int]:
+        """
+        Scans the config table once and returns the decoded
+        values together with the config version.
+        """
+        values = {
+            item["config"]: decode_value(item["value"])
+            for item in parallel_scan(self.dynamodb, self.table.name, total_segments=1)
+        }
+        return values, values.pop(VERSION_KEY, 0)
+
+
+    @instrument()
+    def index_config(self, input_data: dict, expected_version: int = None) -> dict[list]:
+        """
+        Adds or changes EOA config. Only keys whose value changed are
+        written, together with a version bump, in one transaction that
+        fails if the config version is no longer 'expected_version'
+        (i.e. someone else saved in the meantime).
+        """
+        results = {"success": [], "fail": [], "unchanged": [], "version": None, "error": None}
+        current, current_version = self.read_all()
+        if expected_version is None:
+            expected_version = current_version
 
+        items = []
         for k, v in input_data.items():
+            if k in current and current[k] == v:
+                results["unchanged"].append(k)
+                continue
             if isinstance(v, float):
                 v = Decimal(str(v))
             items.append({
                     "config": k,
                     "value": v
                 })
+
+        if not items:
+            print("Config unchanged, nothing to upload")
+            results["version"] = expected_version
+            return results
+
+        condition = "#v = :expected"
+        if expected_version == 0:
+            condition = "attribute_not_exists(#v) OR " + condition
+        version_bump = {
+            "Update": {
+                "TableName": self.table.name,
+                "Key": {"config": VERSION_KEY},
+                "UpdateExpression": "SET #v = if_not_exists(#v, :zero) + :one",
+                "ConditionExpression": condition,
+                "ExpressionAttributeNames": {"#v": "value"},
+                "ExpressionAttributeValues": {":zero": 0, ":one": 1, ":expected": expected_version}
+            }
+        }
+
+        try:
+            self.dynamodb.meta.client.transact_write_items(
+                TransactItems=[{"Put": {"TableName": self.table.name, "Item": item}} for item in items] + [version_bump]
+            )
+            results["success"] = items
+            results["version"] = expected_version + 1
+        except ClientError as e:
+            results["fail"] = items
+            if e.response["Error"]["Code"] == "TransactionCanceledException":
+                results["error"] = "Configuration was changed by someone else since it was loaded. Reload and try again."
+            else:
+                results["error"] = str(e)
         
-        with self.table.batch_writer() as batch:
-            for item in items:
-                try:
-                    batch.put_item(Item=item)
-                    results["success"].append(item)
-                except Exception as e:
-                    results["fail"].append(item)
-        
-        print(f"Uploaded config:\n {results["success"]}")
+        print(f"Uploaded config:\n {results['success']}")
         if results["fail"]:
-            print(f"Failed to upload following config:\n {results["fail"]}")
+            print(f"Failed to upload following config:\n {results['fail']} ({results['error']})")
+
+        if self.cache is not None:
+            self.cache.invalidate()
         
         return results
 
 
+    @instrument()
     def get_config(self, config_name: str = None) -> dict:
         """
-        Fetches the current specified config
+        Fetches the current specified config, from the
+        cache when one is attached.
         """
+        if self.cache is not None:
+            values = self.cache.values()
+            if not config_name:
+                return [{"config": k, "value": v} for k, v in values.items()]
+            return values[config_name]
+
         if not config_name:
-            response = self.table.scan()["Items"] 
+            values, _ = self.read_all()
+            response = [{"config": k, "value": v} for k, v in values.items()]
             return response
         else:
             response = self.table.get_item(
@@ -54,137 +271,270 @@ class Config():
                     "config": config_name
                 }
             )
-            value = response["Item"]["value"]
-            if isinstance(value, Decimal):
-                value = float(value)
+            value = decode_value(response["Item"]["value"])
         return value
 
 
 class Exclusions():
 
-    def __init__(self, resource: boto3, timezone: Any):
+    def __init__(self, resource: boto3, timezone: Any, cache: Any = None):
         self.dynamodb = resource
         self.table = self.dynamodb.Table("eoa-exclusions")
         self.timezone = timezone
+        self.cache = cache
+
+    def _update_each(self, provider_ids: Iterable, request: Callable[[str], dict], max_workers: int = 16) -> dict:
+        """
+        Runs one update_item per provider ID concurrently with bounded
+        parallelism; throttled requests are retried by the client's
+        adaptive retry mode. 'request' returns the update_item arguments
+        for an ID besides the table and key. Returns the IDs that
+        succeeded and failed with the error per failure, plus the
+        returned attributes of every successful update.
+        """
+        client = self.dynamodb.meta.client
+        results = {"success": [], "fail": [], "errors": {}, "attributes": {}}
+
+        def update(provider_id):
+            return client.update_item(
+                TableName=self.table.name,
+                Key={
+                    "provider_id": provider_id
+                },
+                **request(provider_id)
+            )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(update, provider_id): provider_id for provider_id in provider_ids}
+            for future in as_completed(futures):
+                provider_id = futures[future]
+                try:
+                    response = future.result()
+                    results["success"].append(provider_id)
+                    results["attributes"][provider_id] = response.get("Attributes", {})
+                except Exception as e:
+                    results["fail"].append(provider_id)
+                    results["errors"][provider_id] = str(e)
+                    print(f"Error updating {provider_id}: {e}")
 
-    def exclude_providers(self, provider_ids: list, permanent: bool = False) -> str:
+        return results
+
+
+    def _bulk_update(self, provider_ids: list, update_expression: str, values: dict, max_workers: int = 16) -> dict:
+        """
+        Runs the same atomic update for every provider ID. Returns the
+        IDs that succeeded and failed with the error per failure, plus
+        the new num_targeted of every updated provider.
+        """
+        results = self._update_each(
+            provider_ids,
+            lambda provider_id: {
+                "UpdateExpression": update_expression,
+                "ExpressionAttributeValues": values,
+                "ReturnValues": "UPDATED_NEW"
+            },
+            max_workers=max_workers
+        )
+        results["updated"] = {
+            provider_id: int(attributes["num_targeted"])
+            for provider_id, attributes in results.pop("attributes").items()
+        }
+        return results
+
+
+    def _expiry_timestamp(self, saved_date: str, persistance: int) -> int:
+        """
+        Epoch seconds at which a record saved on 'saved_date' expires:
+        midnight after 'persistance' full days, in the table's timezone.
+        """
+        day = datetime.strptime(saved_date, "%Y-%m-%d") + timedelta(days=persistance + 1)
+        if hasattr(self.timezone, "localize"):
+            day = self.timezone.localize(day)
+        else:
+            day = day.replace(tzinfo=self.timezone)
+        return int(day.timestamp())
+
+
+    def _update_quota(
+            self,
+            provider_ids: list,
+            quota_expression: str,
+            values: dict,
+            permanent: bool,
+            persistance: int,
+            max_workers: int
+        ) -> dict:
+        """
+        Applies a num_targeted update together with the last update
+        time and the TTL expiry. Permanent records never expire.
+        """
+        current_date = datetime.now(self.timezone).strftime("%Y-%m-%d")
+        expires_at = None if permanent else self._expiry_timestamp(current_date, persistance)
+
+        update_expression = f"SET {quota_expression}, last_saved = :date, permanent = :state"
+        values = {**values, ":date": current_date, ":state": permanent}
+        if expires_at is None:
+            update_expression += f" REMOVE {TTL_ATTRIBUTE}"
+        else:
+            update_expression += f", {TTL_ATTRIBUTE} = :expiry"
+            values[":expiry"] = expires_at
+
+        results = self._bulk_update(provider_ids, update_expression, values, max_workers=max_workers)
+
+        if self.cache is not None:
+            self.cache.update(results["updated"], expires_at)
+        return results
+
+
+    @instrument()
+    def exclude_providers(self, provider_ids: list, permanent: bool = False, persistance: int = 5, max_workers: int = 16) -> dict:
         """
         Updates weekly targeting quota for DPs or add new
         DPs to DynamoDB table incl. the last update time.  
+        Non-permanent records expire after 'persistance' days.
         """
-        results = {"success":0, "fail":0}
-        current_date = datetime.now(self.timezone).strftime("%Y-%m-%d")
+        results = self._update_quota(
+            provider_ids,
+            "num_targeted = if_not_exists(num_targeted, :zero) + :incr",
+            {
+                ":zero": Decimal(0),
+                ":incr": Decimal(1)
+            },
+            permanent,
+            persistance,
+            max_workers
+        )
+        print(f"Increased DP targeting quota: {len(results['success'])} succeeded, {len(results['fail'])} failed")
+        return results
 
-        for provider_id in provider_ids:
-            try:
-                response = self.table.update_item(
-                    Key={
-                        "provider_id": provider_id
-                    },
-                    UpdateExpression="SET num_targeted = if_not_exists(num_targeted, :zero) + :incr, last_saved = :date, permanent = :state",
-                    ExpressionAttributeValues={
-                        ":zero": Decimal(0),
-                        ":incr": Decimal(1),
-                        ":date": current_date,
-                        ":state": permanent
-                    },
-                    ReturnValues="UPDATED_NEW"
-                )
-                results["success"] += 1
-
-            except Exception as e:
-                results["fail"] += 1
-                print(e)
-
-        return f"Increased DP targeting quota: {results}"
-
-
-    def fully_exclude_providers(self, provider_ids: list, permanent: bool = False) -> str:
+
+    @instrument()
+    def fully_exclude_providers(self, provider_ids: list, permanent: bool = False, persistance: int = 5, max_workers: int = 16) -> dict:
         """
         Updates weekly targeting quota for DPs or add new
         DPs to DynamoDB table incl. the last update time.  
+        Non-permanent records expire after 'persistance' days.
         """
-        results = {"success":0, "fail":0}
-        current_date = datetime.now(self.timezone).strftime("%Y-%m-%d")
+        results = self._update_quota(
+            provider_ids,
+            "num_targeted = if_not_exists(num_targeted, :inf) + :inf",
+            {
+                ":inf": 99
+            },
+            permanent,
+            persistance,
+            max_workers
+        )
+        print(f"Removed providers from this week's targeting: {len(results['success'])} succeeded, {len(results['fail'])} failed")
+        return results
 
-        for provider_id in provider_ids:
-            try:
-                response = self.table.update_item(
-                    Key={
-                        "provider_id": provider_id
-                    },
-                    UpdateExpression="SET num_targeted = if_not_exists(num_targeted, :inf) + :inf, last_saved = :date, permanent = :state",
-                    ExpressionAttributeValues={
-                        ":inf": 99,
-                        ":date": current_date,
-                        ":state": permanent
-                    },
-                    ReturnValues="UPDATED_NEW"
-                )
-                results["success"] += 1
-
-            except Exception as e:
-                results["fail"] += 1
-                print(e)
-
-        return f"Removed providers from this week's targeting: {results}"
-
-
-    def get_exclusions(self, targets_quota: int = 2, persistance: int = 5, erase_old: bool = True) -> dict[list]:
-        """
-        Erases any old provider records and returns the
-        current active list of excluded providers.
-        """
-        if erase_old:
-            # Find the old providers (e.g. last excluded 5 days ago)
-            threshold_date = (datetime.now(self.timezone) - timedelta(days=persistance)).strftime("%Y-%m-%d")
-            response = self.table.scan(
-                FilterExpression="last_saved < :thres and permanent = :state",
-                ExpressionAttributeValues={
-                    ":thres": threshold_date,
-                    ":state": False
+
+    @instrument()
+    def backfill_expiry(self, persistance: int = 5, dry_run: bool = False, max_workers: int = 16) -> dict:
+        """
+        One-off migration: sets the TTL expiry on existing non-permanent
+        records from their 'last_saved' date. Records that already have
+        an expiry are left untouched.
+        """
+        items = list(parallel_scan(
+            self.dynamodb,
+            self.table.name,
+            FilterExpression=Attr(TTL_ATTRIBUTE).not_exists() & Attr("permanent").ne(True) & Attr("last_saved").exists(),
+            ProjectionExpression="provider_id, last_saved"
+        ))
+        print(f"Found {len(items)} exclusion records without an expiry")
+        if dry_run:
+            return {"success": [], "fail": [], "errors": {}, "pending": len(items)}
+
+        expiries = {item["provider_id"]: self._expiry_timestamp(item["last_saved"], persistance) for item in items}
+        results = self._update_each(
+            expiries,
+            lambda provider_id: {
+                "UpdateExpression": f"SET {TTL_ATTRIBUTE} = :expiry",
+                "ConditionExpression": f"attribute_not_exists({TTL_ATTRIBUTE})",
+                "ExpressionAttributeValues": {
+                    ":expiry": expiries[provider_id]
                 }
-            )
+            },
+            max_workers=max_workers
+        )
+        results.pop("attributes")
 
-            # Delete the old records
-            results = {"success":0, "fail":0}
-            for item in response["Items"]:
-                try:
-                    self.table.delete_item(
-                        Key={
-                            "provider_id": item["provider_id"]
-                        }
-                    )
-                    results["success"] +=1
-                except Exception as e:
-                    results["fail"] +=1
-                    print(e)
-            print(f"Removing all records submitted before {threshold_date}:")
-            print(f"Found and removed {results["success"]} old provider_id exclusions")
-
-        # Fetch the current up-to-date exclusions
-        response = self.table.scan(
-            FilterExpression=Attr('num_targeted').gte(targets_quota)
+        print(f"Backfilled expiry on {len(results['success'])} records, {len(results['fail'])} failed")
+        return results
+
+
+    def enable_ttl(self) -> None:
+        """
+        Turns on DynamoDB TTL for the expiry attribute, if not already on.
+        """
+        client = self.dynamodb.meta.client
+        status = client.describe_time_to_live(TableName=self.table.name)["TimeToLiveDescription"]
+        if status.get("TimeToLiveStatus") in ("ENABLED", "ENABLING"):
+            print(f"TTL already {status['TimeToLiveStatus'].lower()} on {status.get('AttributeName')}")
+            return
+        client.update_time_to_live(
+            TableName=self.table.name,
+            TimeToLiveSpecification={"Enabled": True, "AttributeName": TTL_ATTRIBUTE}
         )
+        print(f"Enabled TTL on {self.table.name}.{TTL_ATTRIBUTE}")
 
-        exclusions = {"items": [], "fail": []}
-        for item in response["Items"]:
-            try:
-                exclusions["items"].append(item["provider_id"])
-            except Exception as e:
-                exclusions["fail"].append(item["provider_id"])
-                print(f"Error processing {item.get('provider_id', 'unknown')}: {str(e)}")
 
-        return exclusions
+    def _delete_items(self, items: Iterable[dict]) -> dict:
+        """
+        Bulk-deletes scanned exclusion records and writes the deletes
+        through to the cache. If some deletes failed it is unknown which
+        ones, so the cache is rebuilt from the table instead.
+        """
+        removed = []
 
+        def keys():
+            for item in items:
+                removed.append(item["provider_id"])
+                yield {"provider_id": item["provider_id"]}
+
+        results = bulk_delete(self.dynamodb, self.table.name, keys())
 
-    def remove_all_exclusions(self, permanent: bool = False) -> dict[list]:
+        if self.cache is not None:
+            if results["fail"]:
+                self.cache.refresh()
+            else:
+                self.cache.discard(removed)
+        return results
+
+
+    @instrument()
+    def get_exclusions(self, targets_quota: int = 2, total_segments: int = 4) -> set[str]:
         """
-        Remove all non-permanent exclusion records.
+        Returns the current active set of excluded provider IDs.
+        Stale records are removed by DynamoDB TTL; records that have
+        expired but not yet been deleted are filtered out here.
         """
-        results = {"success":0, "fail":0}
+        if self.cache is not None:
+            return self.cache.excluded(targets_quota)
+
+        now = int(time.time())
+        items = parallel_scan(
+            self.dynamodb,
+            self.table.name,
+            total_segments=total_segments,
+            FilterExpression=Attr('num_targeted').gte(targets_quota) & (
+                Attr(TTL_ATTRIBUTE).not_exists() | Attr(TTL_ATTRIBUTE).gt(now)
+            ),
+            ProjectionExpression="provider_id"
+        )
+        return {item["provider_id"] for item in items}
+
 
-        response = self.table.scan(
+    @instrument()
+    def remove_all_exclusions(self, permanent: bool = False, total_segments: int = 4) -> dict[list]:
+        """
+        Remove all non-permanent exclusion records.
+        """
+        items = parallel_scan(
+            self.dynamodb,
+            self.table.name,
+            total_segments=total_segments,
             FilterExpression="permanent = :state",
             ExpressionAttributeValues={
                 ":state": permanent 
@@ -192,24 +542,6 @@ class Exclusions():
             ProjectionExpression="provider_id"
         )
 
-        items = list(set([item["provider_id"] for item in response.get("Items", [])]))
-        print(items[:15])
-
-        batch_size = 25
-        for i in range(0, len(items), batch_size):
-            batch = items[i:i+batch_size]
-            try:
-                with self.table.batch_writer() as batch_writer:
-                    for provider_id in batch:
-                        batch_writer.delete_item(
-                            Key={
-                                "provider_id": provider_id
-                            }
-                        )    
-                results["success"] += len(batch)
-
-            except Exception as e:
-                results["fail"] += len(batch)
-                print(e)
-        
-        return results
\ No newline at end of file
+        results = self._delete_items(items)
+        print(f"Removed {results['success']} exclusions, {results['fail']} failed")
+        return results
@@ -0,0 +1,157 @@
+import boto3
+import hashlib
+import json
+import threading
+import time
+
+from src.utils.aws_utils.dynamo_utils import TTL_ATTRIBUTE, parallel_scan
+from src.utils.general_utils.logging import instrument
+
+
+class ExclusionCache():
+    """
+    In-memory copy of the exclusions table as a provider_id -> num_targeted
+    map. It is loaded with one parallel scan and kept current through
+    write-through updates from Exclusions. Reads only rescan once the copy
+    is older than 'max_age' seconds; changes made by other clients are
+    picked up earlier through an explicit refresh(), e.g. before a cached
+    match run is reused. Records past their TTL expiry are ignored even
+    before DynamoDB deletes them.
+    """
+
+    def __init__(
+            self,
+            resource: boto3,
+            table_name: str = "eoa-exclusions",
+            max_age: float = 3600,
+            total_segments: int = 4
+        ) -> None:
+        self.dynamodb = resource
+        self.table_name = table_name
+        self.max_age = max_age
+        self.total_segments = total_segments
+
+        self._counts = {}
+        self._expires = {}
+        self._last_sync = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+
+    @instrument()
+    def refresh(self) -> None:
+        """
+        Reloads the cache from the table. A filtered scan reads (and
+        bills) the whole table just the same, so every refresh is full
+        and also drops records deleted by other clients.
+        """
+        with self._refresh_lock:
+            counts = {}
+            expires = {}
+            items = parallel_scan(
+                self.dynamodb,
+                self.table_name,
+                total_segments=self.total_segments,
+                ProjectionExpression=f"provider_id, num_targeted, {TTL_ATTRIBUTE}"
+            )
+            for item in items:
+                counts[item["provider_id"]] = int(item.get("num_targeted", 0))
+                if TTL_ATTRIBUTE in item:
+                    expires[item["provider_id"]] = int(item[TTL_ATTRIBUTE])
+
+            with self._lock:
+                self._counts = counts
+                self._expires = expires
+                self._last_sync = time.monotonic()
+            print(f"Loaded {len(counts)} exclusions into the cache")
+
+
+    def _ensure_fresh(self) -> None:
+        if self._last_sync is None or time.monotonic() - self._last_sync >= self.max_age:
+            self.refresh()
+
+
+    def _active(self, provider_id: str, now: float) -> bool:
+        expires_at = self._expires.get(provider_id)
+        return provider_id in self._counts and (expires_at is None or expires_at > now)
+
+
+    def __contains__(self, provider_id: str) -> bool:
+        self._ensure_fresh()
+        return self._active(provider_id, time.time())
+
+
+    def __len__(self) -> int:
+        self._ensure_fresh()
+        return self.cached_len()
+
+
+    def cached_len(self) -> int | None:
+        """
+        Number of active exclusions in the cache as it is, without
+        syncing; None if it was never loaded.
+        """
+        if self._last_sync is None:
+            return None
+        now = time.time()
+        with self._lock:
+            return sum(1 for provider_id in self._counts if self._active(provider_id, now))
+
+
+    def count(self, provider_id: str) -> int:
+        """
+        Returns how many times a provider was targeted this week.
+        """
+        self._ensure_fresh()
+        return self._counts.get(provider_id, 0) if self._active(provider_id, time.time()) else 0
+
+
+    def excluded(self, targets_quota: int = 2) -> set[str]:
+        """
+        Returns the provider IDs that reached the targeting quota.
+        """
+        self._ensure_fresh()
+        now = time.time()
+        with self._lock:
+            return {
+                provider_id for provider_id, count in self._counts.items()
+                if count >= targets_quota and self._active(provider_id, now)
+            }
+
+
+    def snapshot(self) -> str:
+        """
+        Content hash of the active exclusions and their counts,
+        used to tell whether they changed between two runs.
+        """
+        self._ensure_fresh()
+        now = time.time()
+        with self._lock:
+            active = sorted(
+                (provider_id, count) for provider_id, count in self._counts.items()
+                if self._active(provider_id, now)
+            )
+        return hashlib.blake2b(json.dumps(active).encode("utf-8"), digest_size=16).hexdigest()
+
+
+    def update(self, counts: dict, expires_at: int = None) -> None:
+        """
+        Write-through of new num_targeted values after an update.
+        """
+        with self._lock:
+            self._counts.update(counts)
+            for provider_id in counts:
+                if expires_at is None:
+                    self._expires.pop(provider_id, None)
+                else:
+                    self._expires[provider_id] = expires_at
+
+
+    def discard(self, provider_ids: list) -> None:
+        """
+        Write-through of deleted exclusion records.
+        """
+        with self._lock:
+            for provider_id in provider_ids:
+                self._counts.pop(provider_id, None)
+                self._expires.pop(provider_id, None)
@@ -0,0 +1,186 @@
+import io
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from datetime import date, datetime
+from src.utils.general_utils.logging import instrument
+
+OPERATORS = ["==", "!=", "<", "<=", ">", ">=", "in"]
+
+
+class S3RangeFile(io.RawIOBase):
+    """
+    Read-only, seekable file object over an S3 object. Every read
+    is served by a ranged GET, so pyarrow only downloads the footer
+    and the column chunks it actually needs.
+    """
+
+    def __init__(self, client, bucket: str, key: str, size: int = None) -> None:
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.size = size if size is not None else client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+        self.position = 0
+        self.bytes_fetched = 0
+        self.requests = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        elif whence == io.SEEK_END:
+            self.position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        end = min(self.position + len(buffer), self.size)
+        if end <= self.position:
+            return 0
+
+        response = self.client.get_object(
+            Bucket=self.bucket,
+            Key=self.key,
+            Range=f"bytes={self.position}-{end - 1}"
+        )
+        data = response["Body"].read()
+        buffer[:len(data)] = data
+
+        self.position += len(data)
+        self.bytes_fetched += len(data)
+        self.requests += 1
+        return len(data)
+
+
+def _coerce(value, like):
+    """
+    Converts a filter value to the type of the column statistics,
+    e.g. "2025-01-06" to a date when filtering on OFD Date.
+    """
+    if isinstance(value, (list, tuple, set)):
+        return [_coerce(v, like) for v in value]
+    if isinstance(like, datetime) and not isinstance(value, datetime):
+        return pd.Timestamp(value).to_pydatetime()
+    if isinstance(like, date) and not isinstance(like, datetime) and not isinstance(value, date):
+        return pd.Timestamp(value).date()
+    return value
+
+
+def _row_group_matches(row_group, columns: dict, filters: list) -> bool:
+    """
+    Checks the min/max statistics of a row group against the filters.
+    Row groups without usable statistics are always kept.
+    """
+    for column, op, value in filters:
+        stats = row_group.column(columns[column]).statistics
+        if stats is None or not stats.has_min_max:
+            continue
+
+        value = _coerce(value, stats.min)
+        try:
+            if op == "==" and not stats.min <= value <= stats.max:
+                return False
+            if op == "!=" and stats.min == stats.max == value:
+                return False
+            if op == "<" and not stats.min < value:
+                return False
+            if op == "<=" and not stats.min <= value:
+                return False
+            if op == ">" and not stats.max > value:
+                return False
+            if op == ">=" and not stats.max >= value:
+                return False
+            if op == "in" and not any(stats.min <= v <= stats.max for v in value):
+                return False
+        except TypeError:
+            continue
+    return True
+
+
+def _filter_expression(filters: list, samples: dict):
+    """
+    Builds the exact row-level pyarrow expression for the filters.
+    """
+    expression = None
+    for column, op, value in filters:
+        value = _coerce(value, samples.get(column))
+        field = pc.field(column)
+        condition = {
+            "==": lambda: field == value,
+            "!=": lambda: field != value,
+            "<": lambda: field < value,
+            "<=": lambda: field <= value,
+            ">": lambda: field > value,
+            ">=": lambda: field >= value,
+            "in": lambda: field.isin(value)
+        }[op]()
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+@instrument()
+def read_parquet_s3(
+        client,
+        bucket: str,
+        key: str,
+        columns: list = None,
+        filters: list = None,
+        size: int = None
+    ) -> pd.DataFrame:
+    """
+    Reads a Parquet object from S3 with column projection and row-group
+    pushdown. Filters are a list of (column, op, value) tuples combined
+    with AND, e.g. [("Station", "in", ["DXX1", "DXX2"]), ("OFD Date", ">=", "2025-01-06")].
+    Only the footer, the requested columns and the row groups whose
+    statistics can match the filters are fetched.
+    """
+    filters = filters or []
+    for column, op, _ in filters:
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported filter operator '{op}'. Valid operators: {OPERATORS}")
+
+    source = S3RangeFile(client, bucket, key, size)
+    parquet_file = pq.ParquetFile(source)
+    metadata = parquet_file.metadata
+    schema_columns = {name: i for i, name in enumerate(metadata.schema.names)}
+
+    missing = [c for c in (columns or []) + [f[0] for f in filters] if c not in schema_columns]
+    if missing:
+        raise ValueError(f"Columns not found in {key}: {missing}")
+
+    row_groups = [
+        i for i in range(metadata.num_row_groups)
+        if _row_group_matches(metadata.row_group(i), schema_columns, filters)
+    ]
+
+    read_columns = None
+    if columns is not None:
+        read_columns = list(dict.fromkeys(columns + [f[0] for f in filters]))
+
+    table = parquet_file.read_row_groups(row_groups, columns=read_columns, use_pandas_metadata=True)
+
+    if filters:
+        samples = {}
+        for column, _, _ in filters:
+            stats = metadata.row_group(0).column(schema_columns[column]).statistics if metadata.num_row_groups else None
+            samples[column] = stats.min if stats is not None and stats.has_min_max else None
+        table = table.filter(_filter_expression(filters, samples))
+    if columns is not None:
+        table = table.select(columns)
+
+    print(
+        f"Read {len(row_groups)}/{metadata.num_row_groups} row groups of {key}: "
+        f"{source.bytes_fetched} of {source.size} bytes in {source.requests} requests"
+    )
+    return table.to_pandas()
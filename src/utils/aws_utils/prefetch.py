@@ -0,0 +1,77 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+
+class StartupPrefetch():
+    """
+    Runs independent startup loads (clients, config, exclusions, S3
+    listings) on background workers as soon as the app starts. The tasks
+    fill the shared caches themselves, so pages just read those caches;
+    'result' is only needed for values that have no cache of their own.
+    A failed task is logged and left for the page to retry on demand.
+    """
+
+    def __init__(self, tasks: dict[str, Callable], max_workers: int = 4) -> None:
+        self.started_at = time.monotonic()
+        self.timings = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._futures = {name: self._executor.submit(self._run, name, task) for name, task in tasks.items()}
+        self._executor.shutdown(wait=False)
+
+
+    def _run(self, name: str, task: Callable):
+        start = time.monotonic()
+        try:
+            return task()
+        except Exception as e:
+            print(f"Prefetch of {name} failed: {e}")
+            raise
+        finally:
+            with self._lock:
+                self.timings[name] = time.monotonic() - start
+
+
+    def result(self, name: str, timeout: float = None, default=None):
+        """
+        Returns the result of a prefetch task, waiting up to 'timeout'
+        seconds. Returns 'default' if it failed or is not done in time.
+        """
+        future: Future = self._futures.get(name)
+        if future is None:
+            return default
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return default
+
+
+    def take(self, name: str, timeout: float = None, default=None):
+        """
+        Like 'result', but hands the value out only once, for values
+        that go stale (e.g. listings) and must be re-read afterwards.
+        """
+        with self._lock:
+            future = self._futures.pop(name, None)
+        if future is None:
+            return default
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return default
+
+
+    def done(self) -> bool:
+        return all(future.done() for future in self._futures.values())
+
+
+    def status(self) -> dict:
+        """
+        Returns 'pending', 'done' or 'failed' for every task.
+        """
+        return {
+            name: "pending" if not future.done() else "failed" if future.exception() else "done"
+            for name, future in self._futures.items()
+        }
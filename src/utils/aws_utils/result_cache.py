@@ -0,0 +1,102 @@
+import threading
+import time
+
+from src.utils.general_utils.json_files import load_json, save_json
+
+
+class ResultCache():
+    """
+    Local record of completed match_offers runs, keyed by the hash of the
+    uploaded offers, the EOA config version and the exclusion snapshot
+    the run finished with. A hit means the same inputs were already
+    matched and their optimized_offers/ outputs can be reused. Entries
+    expire after 'max_age' seconds and are dropped as soon as the config
+    or the exclusions move on, since they can never match again.
+    """
+
+    def __init__(self, path: str, max_age: float = 24 * 3600) -> None:
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+
+    def _load(self) -> dict:
+        return load_json(self.path)
+
+
+    def _save(self) -> None:
+        """
+        Writes the entries atomically.
+        """
+        save_json(self.path, self._entries)
+
+
+    def _key(self, file_hash: str, config_version: int, exclusion_snapshot: str) -> str:
+        return f"{file_hash}:{config_version}:{exclusion_snapshot}"
+
+
+    def evict(self, config_version: int = None, exclusion_snapshot: str = None) -> int:
+        """
+        Drops expired entries and, when given, entries recorded under a
+        different config version or exclusion snapshot.
+        """
+        now = time.time()
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if now - entry["created"] > self.max_age
+                or (config_version is not None and entry["config_version"] != config_version)
+                or (exclusion_snapshot is not None and entry["exclusion_snapshot"] != exclusion_snapshot)
+            ]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._save()
+        return len(stale)
+
+
+    def get(self, file_hash: str, config_version: int, exclusion_snapshot: str) -> dict | None:
+        """
+        Returns the cached run for these inputs, evicting
+        everything that can no longer match first.
+        """
+        self.evict(config_version, exclusion_snapshot)
+        with self._lock:
+            return self._entries.get(self._key(file_hash, config_version, exclusion_snapshot))
+
+
+    def put(
+            self,
+            file_hash: str,
+            config_version: int,
+            exclusion_snapshot: str,
+            outputs: dict,
+            execution_arn: str = None
+        ) -> None:
+        """
+        Records a successful run and the ETag of every output it left
+        under optimized_offers/.
+        """
+        with self._lock:
+            self._entries[self._key(file_hash, config_version, exclusion_snapshot)] = {
+                "file_hash": file_hash,
+                "config_version": config_version,
+                "exclusion_snapshot": exclusion_snapshot,
+                "outputs": outputs,
+                "execution_arn": execution_arn,
+                "created": time.time()
+            }
+            self._save()
+
+
+    def discard(self, file_hash: str, config_version: int, exclusion_snapshot: str) -> None:
+        with self._lock:
+            if self._entries.pop(self._key(file_hash, config_version, exclusion_snapshot), None) is not None:
+                self._save()
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._save()
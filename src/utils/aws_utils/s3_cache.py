@@ -0,0 +1,166 @@
+import hashlib
+import os
+import threading
+import time
+import pandas as pd
+from botocore.exceptions import ClientError
+from typing import Callable
+from src.utils.general_utils.json_files import load_json, save_json
+from src.utils.general_utils.logging import instrument
+
+INDEX_NAME = "index.json"
+
+
+class S3DiskCache():
+    """
+    Persistent on-disk cache of parsed S3 objects. Entries are keyed by
+    bucket, key and ETag and stored as Arrow/Feather files, so an
+    unchanged object is handed back without downloading or re-parsing
+    it. The least recently used entries are evicted once the cache
+    grows past 'max_bytes'.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 ** 2) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+
+    def _load_index(self) -> dict:
+        """
+        Reads the cache index, starting empty if it is missing or corrupt.
+        """
+        return load_json(os.path.join(self.cache_dir, INDEX_NAME))
+
+
+    def _save_index(self) -> None:
+        """
+        Writes the cache index atomically.
+        """
+        save_json(os.path.join(self.cache_dir, INDEX_NAME), self._index)
+
+
+    def _entry_id(self, bucket: str, key: str) -> str:
+        return hashlib.sha1(f"{bucket}/{key}".encode("utf-8")).hexdigest()
+
+
+    def _path(self, entry_id: str) -> str:
+        return os.path.join(self.cache_dir, entry_id + ".arrow")
+
+
+    def _drop(self, entry_id: str) -> None:
+        self._index.pop(entry_id, None)
+        try:
+            os.remove(self._path(entry_id))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # e.g. still open by another reader on Windows; the file is
+            # orphaned and overwritten when the key is cached again
+            print(f"Could not remove cache file {self._path(entry_id)}: {e}")
+
+
+    def get(self, bucket: str, key: str, etag: str) -> pd.DataFrame | None:
+        """
+        Returns the cached DataFrame if the stored ETag matches.
+        """
+        entry_id = self._entry_id(bucket, key)
+        with self._lock:
+            entry = self._index.get(entry_id)
+            if entry is None or entry["etag"] != etag:
+                return None
+            try:
+                import pyarrow.feather as feather
+                df = feather.read_feather(self._path(entry_id), memory_map=False)
+            except (FileNotFoundError, OSError):
+                self._drop(entry_id)
+                self._save_index()
+                return None
+            entry["last_access"] = time.time()
+            self._save_index()
+            return df
+
+
+    def put(self, bucket: str, key: str, etag: str, df: pd.DataFrame) -> bool:
+        """
+        Stores a parsed object and evicts the least recently
+        used entries if the cache is over its size cap. Caching is
+        best-effort: a frame Arrow cannot store (e.g. a column of mixed
+        types) or a failed write is logged and skipped, returning False.
+        """
+        entry_id = self._entry_id(bucket, key)
+        path = self._path(entry_id)
+        with self._lock:
+            import pyarrow as pa
+            import pyarrow.feather as feather
+            tmp = path + ".tmp"
+            try:
+                feather.write_feather(df, tmp)
+                os.replace(tmp, path)
+            except (pa.ArrowException, OSError) as e:
+                print(f"Skipped caching s3://{bucket}/{key}: {e}")
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                return False
+            self._index[entry_id] = {
+                "bucket": bucket,
+                "key": key,
+                "etag": etag,
+                "size": os.path.getsize(path),
+                "last_access": time.time()
+            }
+            self._evict()
+            self._save_index()
+            return True
+
+
+    def _evict(self) -> None:
+        """
+        Removes least recently used entries until under the size cap.
+        """
+        total = sum(entry["size"] for entry in self._index.values())
+        for entry_id, entry in sorted(self._index.items(), key=lambda x: x[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            self._drop(entry_id)
+
+
+    @instrument()
+    def fetch(self, client, bucket: str, key: str, parse: Callable[[bytes], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Reads an object through the cache using a conditional GET
+        (If-None-Match). A 304 response returns the cached frame,
+        otherwise the body is parsed and cached under its new ETag. The
+        parsed frame is returned even if it could not be cached.
+        """
+        entry = self._index.get(self._entry_id(bucket, key))
+        kwargs = {"IfNoneMatch": entry["etag"]} if entry is not None else {}
+
+        try:
+            obj = client.get_object(Bucket=bucket, Key=key, **kwargs)
+        except ClientError as e:
+            if entry is None or e.response["Error"]["Code"] not in ("304", "NotModified"):
+                raise
+            df = self.get(bucket, key, entry["etag"])
+            if df is not None:
+                return df
+            obj = client.get_object(Bucket=bucket, Key=key)
+
+        df = parse(obj["Body"].read())
+        self.put(bucket, key, obj["ETag"], df)
+        return df
+
+
+    def clear(self) -> None:
+        """
+        Removes every cached entry.
+        """
+        with self._lock:
+            for entry_id in list(self._index):
+                self._drop(entry_id)
+            self._save_index()
@@ -1,135 +1,651 @@
 import boto3
+import getpass
 import io
 import os
+import time
+import uuid
+import zlib
 import pandas as pd
+from boto3.s3.transfer import TransferConfig
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Iterable, Iterator
+
+from src.utils.aws_utils.s3_cache import S3DiskCache
+from src.utils.general_utils.json_files import load_json, save_json
+from src.utils.general_utils.logging import instrument
+
+MANIFEST_NAME = ".eoa_download_manifest.json"
+MAX_SINGLE_COPY_SIZE = 5 * 1024 ** 3
+COPY_PART_SIZE = 512 * 1024 ** 2
+DELETE_BATCH_SIZE = 1000
+UPLOAD_PART_SIZE = 8 * 1024 * 1024
+
+
+def _gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Gzip-compresses a stream of byte chunks on the fly.
+    """
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
 
 class S3Handler():
-    def __init__(self, bucket, client):
+    def __init__(self, bucket, client, cache: S3DiskCache = None):
         self.client = client
         self.bucket = bucket
+        self.cache = cache
     
 
-    def list_s3_objects(self, prefix: str) -> list:
+    @instrument()
+    def iter_s3_objects(
+            self,
+            prefix: str,
+            suffix: str | tuple = None,
+            modified_after: datetime = None,
+            modified_before: datetime = None,
+            page_size: int = 1000
+        ) -> Iterator[dict]:
+        """
+        Lazily yields every object under a prefix, following the
+        continuation tokens page by page. Suffix and LastModified
+        filters are applied as each page arrives.
+        """
+        if isinstance(suffix, str):
+            suffix = (suffix,)
+        if suffix is not None:
+            suffix = tuple(s.lower() for s in suffix)
+
+        paginator = self.client.get_paginator("list_objects_v2")
+        pages = paginator.paginate(
+            Bucket=self.bucket,
+            Prefix=prefix,
+            PaginationConfig={"PageSize": page_size}
+        )
+
+        for page in pages:
+            for obj in page.get("Contents", []):
+                if suffix is not None and not obj["Key"].lower().endswith(suffix):
+                    continue
+                if modified_after is not None and obj["LastModified"] < modified_after:
+                    continue
+                if modified_before is not None and obj["LastModified"] >= modified_before:
+                    continue
+                yield obj
+
+
+    def list_s3_objects(self, prefix: str, **filters) -> list:
+        """
+        List all objects in S3 bucket with given prefix
+        """
+        return list(self.iter_s3_objects(prefix, **filters))
+
+
+    def get_latest_object(self, prefix: str, **filters) -> dict | None:
+        """
+        Finds the most recently modified object under a prefix
+        in a single pass over the listing, without sorting it.
+        """
+        return max(
+            self.iter_s3_objects(prefix, **filters),
+            key=lambda x: x["LastModified"],
+            default=None
+        )
+
+
+    def _parse_object(self, key: str, data: bytes) -> pd.DataFrame:
+        """
+        Parses a Parquet/CSV object body into a Dataframe
+        """
+        if key.lower().endswith('.parquet'):
+            return pd.read_parquet(io.BytesIO(data))
+        elif key.lower().endswith('.csv'):
+            return pd.read_csv(io.BytesIO(data))
+        else:
+            raise ValueError(f"Unsupported file type. File must be .csv or .parquet: {key}")
+
+
+    @instrument()
+    def read_parquet(self, key: str, columns: list = None, filters: list = None, size: int = None) -> pd.DataFrame:
+        """
+        Reads only the requested columns and matching row groups
+        of a Parquet object using ranged GETs.
+        """
+        from src.utils.aws_utils.parquet_utils import read_parquet_s3
+        return read_parquet_s3(self.client, self.bucket, key, columns=columns, filters=filters, size=size)
+
+
+    def iter_csv(self, key: str, chunksize: int = 100_000, dtype: dict = None, **read_kwargs) -> Iterator[pd.DataFrame]:
         """
-        List objects in S3 bucket with given prefix
+        Streams a CSV object from S3 and yields DataFrames of up to
+        'chunksize' rows. The dtype schema is fixed for every chunk:
+        either the 'dtype' given or the one of the first chunk.
         """
-        response = self.client.list_objects_v2(Bucket=self.bucket, Prefix=prefix)
-        return response.get('Contents', [])
+        obj = self.client.get_object(Bucket=self.bucket, Key=key)
+        body = obj["Body"]
+        compression = "gzip" if key.lower().endswith(".gz") else None
+        schema = None
+
+        try:
+            with pd.read_csv(body, chunksize=chunksize, dtype=dtype, compression=compression, **read_kwargs) as reader:
+                for chunk in reader:
+                    if schema is None:
+                        schema = chunk.dtypes.to_dict()
+                    else:
+                        try:
+                            chunk = chunk.astype(schema)
+                        except (ValueError, TypeError) as e:
+                            raise ValueError(
+                                f"Chunk of {key} does not match the schema of the first chunk, pass 'dtype' explicitly: {e}"
+                            )
+                    yield chunk
+        finally:
+            body.close()
 
 
-    def get_s3_object(self, prefix: str) -> pd.DataFrame:
+    @instrument()
+    def get_s3_object(
+            self,
+            prefix: str,
+            columns: list = None,
+            filters: list = None,
+            chunksize: int = None,
+            dtype: dict = None
+        ) -> pd.DataFrame | Iterator[pd.DataFrame]:
         """
         Lists a S3 prefix and reads the latest Parquet/CSV 
-        object to return a Dataframe
+        object to return a Dataframe. With a disk cache attached,
+        an unchanged object is served locally without a download.
+        For Parquet, 'columns' and 'filters' are pushed down to S3.
+        For CSV, 'chunksize' returns an iterator of DataFrames instead.
         """
         try:
-            response = self.client.list_objects_v2(Bucket=self.bucket, Prefix=prefix)
-            contents = response.get('Contents', [])
-            
-            if len(contents) >= 1:
-                latest_file = sorted(contents, key=lambda x: x['LastModified'], reverse=True)[0]
+            latest_file = self.get_latest_object(prefix, suffix=(".parquet", ".csv"))
+
+            if latest_file is not None:
                 key = latest_file['Key']
-                
-                if key.endswith('/'):
-                    raise ValueError(f"No files found in directory: {key}")
-                    
+
+                if chunksize is not None and key.lower().endswith(".csv"):
+                    return self.iter_csv(key, chunksize=chunksize, dtype=dtype, usecols=columns)
+
+                if (columns is not None or filters) and key.lower().endswith(".parquet"):
+                    return self.read_parquet(key, columns=columns, filters=filters, size=latest_file["Size"])
+
+                if self.cache is not None:
+                    cached = self.cache.get(self.bucket, key, latest_file["ETag"])
+                    if cached is not None:
+                        return cached
+                    return self.cache.fetch(
+                        self.client, self.bucket, key, lambda data: self._parse_object(key, data)
+                    )
+
                 obj = self.client.get_object(Bucket=self.bucket, Key=key)
-                data = obj['Body'].read()
-                
-                if key.lower().endswith('.parquet'):
-                    return pd.read_parquet(io.BytesIO(data))
-                elif key.lower().endswith('.csv'):
-                    return pd.read_csv(io.BytesIO(data))
-                else:
-                    raise ValueError(f"Unsupported file type. File must be .csv or .parquet: {key}")
+                return self._parse_object(key, obj['Body'].read())
             else:
-                raise ValueError("No objects found in the prefix")
+                raise ValueError(f"No .csv or .parquet objects found in the prefix: {prefix}")
                 
         except Exception as e:
             print(f"Error reading from S3: {str(e)}")
             raise
 
 
-    def bulk_download(self, prefix: str, dest: str, resource: boto3, fmt: str = "csv") -> None:
+    def _load_manifest(self, dest: str) -> dict:
+        """
+        Reads the local manifest of files already downloaded
+        into a folder, keyed by local file name.
+        """
+        return load_json(os.path.join(dest, MANIFEST_NAME))
+
+
+    def _save_manifest(self, dest: str, manifest: dict) -> None:
+        """
+        Writes the download manifest atomically so an interrupted
+        run never leaves a half-written file behind.
+        """
+        save_json(os.path.join(dest, MANIFEST_NAME), manifest, indent=2)
+
+
+    @instrument(bytes_from="bytes")
+    def bulk_download(
+            self,
+            prefix: str,
+            dest: str,
+            resource: boto3 = None,
+            fmt: str = "csv",
+            max_workers: int = 8,
+            chunk_size: int = 8 * 1024 * 1024,
+            on_progress: Callable[[dict], None] = None,
+            save_every: int = 10
+        ) -> dict:
         """
-        Downloads all objects within an S3 folder that
-        match the specified format.
+        Downloads all objects within an S3 folder that match the
+        specified format using a bounded pool of workers. Files whose
+        ETag matches the local manifest are skipped, so a re-run only
+        fetches what changed. The manifest is saved every 'save_every'
+        downloads, so an interrupted run resumes where it stopped.
+        Progress is reported through 'on_progress' on the calling
+        thread, once after the skip check and after every download.
         """
         if prefix and not prefix.endswith("/"):
             prefix += "/"
 
         os.makedirs(dest, exist_ok=True)
-        b = resource.Bucket(self.bucket)
+        client = resource.meta.client if resource is not None else self.client
+        transfer_cfg = TransferConfig(
+            multipart_threshold=chunk_size,
+            multipart_chunksize=chunk_size,
+            max_concurrency=4
+        )
+
+        manifest = self._load_manifest(dest)
+        results = {"success": [], "skipped": [], "fail": [], "bytes": 0, "seconds": 0.0}
+        pending = []
+        user = getpass.getuser()
+
+        for obj in self.iter_s3_objects(prefix, suffix=fmt):
+            name = "EOA_" + user + "_" + os.path.basename(obj["Key"])
+            local = os.path.join(dest, name)
+            entry = manifest.get(name)
+            if (
+                entry is not None
+                and entry["etag"] == obj["ETag"]
+                and os.path.exists(local)
+                and os.path.getsize(local) == obj["Size"]
+            ):
+                results["skipped"].append(obj["Key"])
+            else:
+                pending.append((obj, name, local))
+
+        total = len(pending) + len(results["skipped"])
+        start = time.perf_counter()
 
-        for obj in b.objects.filter(Prefix=prefix):
-            if obj.key.lower().endswith(fmt) and not obj.key.endswith("/"):
-                local = os.path.join(dest, "EOA_" + os.getlogin() + "_" + os.path.basename(obj.key))
-                b.download_file(obj.key, local)
-                print(f"Downloaded {local}")
+        def report():
+            if on_progress is None:
+                return
+            elapsed = time.perf_counter() - start
+            on_progress({
+                "done": len(results["success"]) + len(results["skipped"]) + len(results["fail"]),
+                "total": total,
+                "skipped": len(results["skipped"]),
+                "bytes": results["bytes"],
+                "elapsed": elapsed,
+                "throughput": results["bytes"] / elapsed if elapsed > 0 else 0.0
+            })
+
+        report()
+        unsaved = 0
+
+        def download(obj, local):
+            client.download_file(self.bucket, obj["Key"], local, Config=transfer_cfg)
+            return obj
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = {
+                    pool.submit(download, obj, local): (obj, name, local)
+                    for obj, name, local in pending
+                }
+                for future in as_completed(futures):
+                    obj, name, local = futures[future]
+                    try:
+                        future.result()
+                        manifest[name] = {"key": obj["Key"], "etag": obj["ETag"], "size": obj["Size"]}
+                        results["success"].append(obj["Key"])
+                        results["bytes"] += obj["Size"]
+                        print(f"Downloaded {local}")
+                        unsaved += 1
+                        if unsaved >= save_every:
+                            self._save_manifest(dest, manifest)
+                            unsaved = 0
+                    except Exception as e:
+                        results["fail"].append(obj["Key"])
+                        print(f"Error downloading {obj['Key']}: {e}")
+
+                    report()
+        finally:
+            self._save_manifest(dest, manifest)
+
+        results["seconds"] = time.perf_counter() - start
+        print(
+            f"Downloaded {len(results['success'])} files ({results['bytes']} bytes) in {results['seconds']:.1f}s, "
+            f"skipped {len(results['skipped'])} unchanged files"
+        )
+        return results
 
 
-    def save_to_s3(self, df: pd.DataFrame, key: str) -> bool:
+    def _upload_part(self, key: str, upload_id: str, number: int, body: bytes) -> tuple[dict, int]:
         """
-        Save DataFrame to S3 as CSV file.
+        Uploads one part of a multipart upload.
         """
-        buffer = io.StringIO()
-        df.to_csv(buffer, index=False)
-        bytes_data = buffer.getvalue().encode('utf-8')
-        
-        response = self.client.put_object(
+        response = self.client.upload_part(
             Bucket=self.bucket,
             Key=key,
-            Body=bytes_data,
-            ContentType='text/csv'
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=body
         )
+        return {"PartNumber": number, "ETag": response["ETag"]}, len(body)
 
-        if response['ResponseMetadata']['HTTPStatusCode'] == 200:
-            print(f"Successfully saved CSV to {key}")
-            return True
-        else:
-            print(f"Upload failed with response: {response}")
-            return False
 
+    @instrument(bytes_from="bytes")
+    def upload_stream(
+            self,
+            chunks: Iterable[bytes],
+            key: str,
+            content_type: str = "application/octet-stream",
+            content_encoding: str = None,
+            part_size: int = UPLOAD_PART_SIZE,
+            max_workers: int = 4,
+            on_progress: Callable[[dict], None] = None
+        ) -> dict:
+        """
+        Uploads a stream of byte chunks as a multipart upload. Parts are
+        sent in parallel while the next ones are produced, with at most
+        'max_workers' parts held in memory at once. Streams smaller than
+        a single part fall back to one put_object call.
+        """
+        extra = {"ContentType": content_type}
+        if content_encoding is not None:
+            extra["ContentEncoding"] = content_encoding
+
+        stats = {"key": key, "bytes": 0, "parts": 0, "seconds": 0.0}
+        parts = []
+        in_flight = deque()
+        buffer = bytearray()
+        upload_id = None
+        start = time.perf_counter()
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+
+        def report():
+            if on_progress is not None:
+                elapsed = time.perf_counter() - start
+                on_progress({
+                    "bytes_sent": stats["bytes"],
+                    "parts": stats["parts"],
+                    "elapsed": elapsed,
+                    "throughput": stats["bytes"] / elapsed if elapsed > 0 else 0.0
+                })
+
+        def collect_oldest():
+            part, size = in_flight.popleft().result()
+            parts.append(part)
+            stats["bytes"] += size
+            stats["parts"] += 1
+            report()
+
+        def submit(body):
+            if len(in_flight) >= max_workers:
+                collect_oldest()
+            number = stats["parts"] + len(in_flight) + 1
+            in_flight.append(pool.submit(self._upload_part, key, upload_id, number, body))
+
+        try:
+            for chunk in chunks:
+                buffer += chunk
+                while len(buffer) >= part_size:
+                    if upload_id is None:
+                        upload_id = self.client.create_multipart_upload(
+                            Bucket=self.bucket, Key=key, **extra
+                        )["UploadId"]
+                    submit(bytes(buffer[:part_size]))
+                    del buffer[:part_size]
+
+            if upload_id is None:
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=bytes(buffer), **extra)
+                stats["bytes"] = len(buffer)
+                stats["parts"] = 1
+                report()
+            else:
+                if buffer:
+                    submit(bytes(buffer))
+                while in_flight:
+                    collect_oldest()
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])}
+                )
+        except Exception:
+            pool.shutdown(wait=True, cancel_futures=True)
+            if upload_id is not None:
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+        finally:
+            pool.shutdown(wait=True)
+
+        stats["seconds"] = time.perf_counter() - start
+        return stats
 
-    def move_s3_files(self, old_folder: str, new_folder: str, fmt: str= None) -> dict:
+
+    @instrument()
+    def save_to_s3(
+            self,
+            df: pd.DataFrame,
+            key: str,
+            compress: bool = False,
+            chunk_rows: int = 50_000,
+            part_size: int = UPLOAD_PART_SIZE,
+            max_workers: int = 4,
+            on_progress: Callable[[dict], None] = None
+        ) -> bool:
         """
-        Moves all files in a folder to a different folder
+        Save DataFrame to S3 as CSV file. Rows are encoded in chunks and
+        streamed as a multipart upload, so memory stays bounded by the
+        part size rather than the size of the file. Set 'compress' to
+        gzip the CSV on the fly.
         """
-        objects = self.list_s3_objects(old_folder)
-        print(f"Found {len(objects)} offer files in the {old_folder} folder.")
+        progress = {"rows_encoded": 0, "total_rows": len(df)}
+
+        def csv_chunks():
+            if df.empty:
+                yield df.to_csv(index=False).encode("utf-8")
+            for i in range(0, len(df), chunk_rows):
+                chunk = df.iloc[i:i + chunk_rows]
+                yield chunk.to_csv(index=False, header=(i == 0)).encode("utf-8")
+                progress["rows_encoded"] += len(chunk)
+
+        def report(stats):
+            if on_progress is not None:
+                on_progress({**stats, **progress})
 
-        if fmt is not None:
-            objects = [obj for obj in objects if obj['Key'].lower().endswith(fmt)]
+        chunks = _gzip_chunks(csv_chunks()) if compress else csv_chunks()
+        stats = self.upload_stream(
+            chunks,
+            key,
+            content_type="text/csv",
+            content_encoding="gzip" if compress else None,
+            part_size=part_size,
+            max_workers=max_workers,
+            on_progress=report
+        )
+
+        print(f"Successfully saved CSV to {key} ({stats['bytes']} bytes in {stats['parts']} parts, {stats['seconds']:.1f}s)")
+        return True
 
-        results = {"success": [], "fail": []}
-        for obj in objects:
-            source_key = obj["Key"]
-            new_key = source_key.replace(old_folder, new_folder)
-            print(f"Moving {source_key} → {new_key}")
 
+    @instrument(bytes_from="bytes")
+    def upload_validated(
+            self,
+            data: bytes,
+            key: str,
+            validate: Callable[[], dict],
+            staging_prefix: str = "staging/",
+            content_type: str = "text/csv",
+            part_size: int = UPLOAD_PART_SIZE,
+            max_workers: int = 4,
+            on_progress: Callable[[dict], None] = None
+        ) -> dict:
+        """
+        Streams the original file bytes to a staging key as a multipart
+        upload while 'validate' checks the same bytes in a worker. The
+        object is only promoted to 'key' with a server-side copy once
+        validation passes; the staging copy is removed either way.
+        'validate' must return a dict with a boolean 'valid'; if it
+        raises, the upload is reported as invalid.
+        """
+        staging_key = f"{staging_prefix}{uuid.uuid4().hex}/{os.path.basename(key)}"
+        start = time.perf_counter()
+
+        def parts():
+            for offset in range(0, max(len(data), 1), part_size):
+                yield data[offset:offset + part_size]
+
+        with ThreadPoolExecutor(max_workers=1) as validator:
+            validation = validator.submit(validate)
             try:
-                self.client.copy_object(
-                    Bucket=self.bucket,
-                    CopySource={"Bucket": self.bucket, "Key": source_key},
-                    Key=new_key
+                stats = self.upload_stream(
+                    parts(),
+                    staging_key,
+                    content_type=content_type,
+                    part_size=part_size,
+                    max_workers=max_workers,
+                    on_progress=on_progress
                 )
-                
+            except Exception:
+                validation.cancel()
+                raise
 
-                self.client.delete_object(
+            result = {
+                "key": key,
+                "staging_key": staging_key,
+                "promoted": False,
+                "bytes": stats["bytes"],
+                "validation": None,
+                "seconds": 0.0
+            }
+            try:
+                try:
+                    report = validation.result()
+                except Exception as e:
+                    # A validator crash rejects the upload like a failed check
+                    report = {"valid": False, "errors": [f"Validation failed: {e}"], "warnings": []}
+                result["validation"] = report
+                if report["valid"]:
+                    self._copy_object(staging_key, key, stats["bytes"])
+                    result["promoted"] = True
+            finally:
+                errors = self._delete_keys([staging_key])
+                if errors:
+                    print(f"Failed to remove staging object {staging_key}: {errors}")
+
+        result["seconds"] = time.perf_counter() - start
+        if result["promoted"]:
+            print(f"Uploaded and promoted {stats['bytes']} bytes to {key} in {result['seconds']:.1f}s")
+        else:
+            print(f"Upload to {key} rejected by validation: {report.get('errors')}")
+        return result
+
+
+    @instrument()
+    def _copy_object(self, source_key: str, new_key: str, size: int, part_size: int = COPY_PART_SIZE) -> None:
+        """
+        Server-side copy of a single object. Objects above the
+        single-request copy limit are copied as a multipart upload.
+        """
+        source = {"Bucket": self.bucket, "Key": source_key}
+
+        if size <= MAX_SINGLE_COPY_SIZE:
+            self.client.copy_object(Bucket=self.bucket, CopySource=source, Key=new_key)
+            return
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=new_key)["UploadId"]
+        try:
+            parts = []
+            for number, offset in enumerate(range(0, size, part_size), start=1):
+                last_byte = min(offset + part_size, size) - 1
+                response = self.client.upload_part_copy(
                     Bucket=self.bucket,
-                    Key=source_key
+                    Key=new_key,
+                    UploadId=upload_id,
+                    PartNumber=number,
+                    CopySource=source,
+                    CopySourceRange=f"bytes={offset}-{last_byte}"
                 )
+                parts.append({"PartNumber": number, "ETag": response["CopyPartResult"]["ETag"]})
 
-                results["success"].append(source_key)
-            
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=new_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts}
+            )
+        except Exception:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=new_key, UploadId=upload_id)
+            raise
+
+
+    @instrument()
+    def _delete_keys(self, keys: list) -> dict:
+        """
+        Deletes keys in batches of up to 1,000 per request and
+        returns the error message for every key that failed.
+        """
+        errors = {}
+        for i in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[i:i + DELETE_BATCH_SIZE]
+            try:
+                response = self.client.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+                )
+                for error in response.get("Errors", []):
+                    errors[error["Key"]] = f"{error.get('Code')}: {error.get('Message')}"
             except Exception as e:
+                for key in batch:
+                    errors[key] = str(e)
+        return errors
+
+
+    @instrument()
+    def move_s3_files(self, old_folder: str, new_folder: str, fmt: str= None, max_workers: int = 16) -> dict:
+        """
+        Moves all files in a folder to a different folder. Copies run
+        in parallel server-side, the sources are then removed with
+        batched deletes. Every key ends up in either 'success' or
+        'fail', with the reason for failures kept under 'errors'.
+        """
+        objects = self.list_s3_objects(old_folder, suffix=fmt)
+        print(f"Found {len(objects)} offer files in the {old_folder} folder.")
+
+        results = {"success": [], "fail": [], "errors": {}}
+        copied = []
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {}
+            for obj in objects:
+                source_key = obj["Key"]
+                new_key = source_key.replace(old_folder, new_folder)
+                print(f"Moving {source_key} → {new_key}")
+                futures[pool.submit(self._copy_object, source_key, new_key, obj["Size"])] = source_key
+
+            for future in as_completed(futures):
+                source_key = futures[future]
+                try:
+                    future.result()
+                    copied.append(source_key)
+                except Exception as e:
+                    results["fail"].append(source_key)
+                    results["errors"][source_key] = f"Copy failed: {e}"
+                    print(f"Error moving {source_key}: {e}")
+
+        delete_errors = self._delete_keys(copied)
+        for source_key in copied:
+            if source_key in delete_errors:
                 results["fail"].append(source_key)
-                print(f"Error moving {source_key}: {e}")
-        
-        print(f"Moved {len(results["success"])} files to {new_folder}")
+                results["errors"][source_key] = f"Copied but not deleted: {delete_errors[source_key]}"
+            else:
+                results["success"].append(source_key)
+
+        print(f"Moved {len(results['success'])} files to {new_folder}")
         if len(results["fail"]) != 0:
             print(f"Following files failed to move:")
             for i in results["fail"]:
-                print(i)
-                
+                print(f"{i}: {results['errors'][i]}")
 
+        return results
@@ -1,42 +1,328 @@
 import boto3
 import json
+import os
+import threading
 import time
+import uuid
+from botocore.exceptions import ClientError
 from datetime import datetime
+from src.utils.general_utils.logging import instrument
 
+COMMANDS = ["predict_churn", "match_offers"]
+# Polling errors that will not go away by retrying
+PERMANENT_ERRORS = {"AccessDeniedException", "ExecutionDoesNotExist", "InvalidArn", "UnrecognizedClientException"}
 
-def stepfunction_invoke(command: str, client: boto3, arn: str) -> dict[str]:
+
+def _apply_state_events(events: list[dict], states: list[dict], open_states: dict) -> None:
     """
-    Invokes an AWS step-functions state-machine to run compute
-    intensitve ECS/Lambda workflows. Example 'command' input:
+    Folds StateEntered/StateExited events, oldest first, into 'states':
+    one record per state with its start, end and duration (None while
+    still running). 'open_states' holds the records not yet exited.
+    """
+    for event in events:
+        if event["type"].endswith("StateEntered"):
+            details = event["stateEnteredEventDetails"]
+            record = {
+                "state": details["name"],
+                "type": event["type"][:-len("StateEntered")],
+                "start": event["timestamp"],
+                "end": None,
+                "duration": None
+            }
+            states.append(record)
+            open_states.setdefault(details["name"], []).append(record)
+
+        elif event["type"].endswith("StateExited"):
+            pending = open_states.get(event["stateExitedEventDetails"]["name"])
+            if pending:
+                # Pages read these records concurrently and treat a set
+                # 'end' as finished, so 'duration' must be set first
+                record = pending.pop(0)
+                record["duration"] = (event["timestamp"] - record["start"]).total_seconds()
+                record["end"] = event["timestamp"]
+
+
+@instrument()
+def read_new_events(client: boto3, execution_arn: str, after_id: int = 0) -> list[dict]:
+    """
+    Reads the history events newer than 'after_id', oldest first. The
+    history is paged newest first, so only the new events are fetched.
+    """
+    events = []
+    paginator = client.get_paginator("get_execution_history")
+
+    for page in paginator.paginate(executionArn=execution_arn, includeExecutionData=False, reverseOrder=True):
+        for event in page["events"]:
+            if event["id"] <= after_id:
+                return events[::-1]
+            events.append(event)
+    return events[::-1]
+
+
+def load_state_timings(path: str) -> list[dict]:
+    """
+    Loads the per-state timings recorded locally by the tracker,
+    one row per state per execution, oldest first.
+    """
+    rows = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                run = json.loads(line)
+                for state in run["states"]:
+                    rows.append({
+                        "command": run["command"],
+                        "execution_arn": run["execution_arn"],
+                        "status": run["status"],
+                        "run_started": run["started_at"],
+                        **state
+                    })
+    except FileNotFoundError:
+        pass
+    return rows
+
+
+class ExecutionHandle():
     """
+    Live view of one Step Functions execution. The tracker's background
+    worker updates it; pages and sessions only read from it.
+    """
+
+    def __init__(self, command: str, execution_arn: str, started_at: datetime) -> None:
+        self.command = command
+        self.execution_arn = execution_arn
+        self.started_at = started_at
+        self.status = "RUNNING"
+        self.output = None
+        self.error = None
+        self.cause = None
+        self.description = {"executionArn": execution_arn, "status": "RUNNING"}
+        self.states = []
+        self.last_event_id = 0
+        self._open_states = {}
+        self.polls = 0
+        self.poll_errors = 0
+        self.exception = None
+        self._done = threading.Event()
+
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+
+    @property
+    def elapsed(self) -> float:
+        return (datetime.now(self.started_at.tzinfo) - self.started_at).total_seconds()
+
+
+    def _update(self, desc: dict) -> None:
+        self.description = desc
+        self.status = desc["status"]
+        self.polls += 1
+        if self.status == "RUNNING":
+            return
+
+        if self.status == "SUCCEEDED":
+            self.output = json.loads(desc["output"]) if desc.get("output") else None
+            print(f"SUCCESS: {self.command} workflow succeeded, output:", self.output)
+        else:
+            self.error = desc.get("error", "Unknown")
+            self.cause = desc.get("cause", "Unknown")
+            print(f"ERROR: {self.command} workflow failed ({self.status}):", self.cause)
+        self._done.set()
+
+
+    def _fail(self, exception: Exception) -> None:
+        """
+        Gives up on an execution that can no longer be polled.
+        """
+        self.exception = exception
+        self.status = "POLL_FAILED"
+        self.description = {**self.description, "status": self.status}
+        self.error = type(exception).__name__
+        self.cause = str(exception)
+        print(f"ERROR: stopped tracking {self.command} workflow after {self.poll_errors} failed polls:", self.cause)
+        self._done.set()
+
+
+    def wait(self, timeout: float = None) -> dict:
+        """
+        Blocks until the execution finishes and returns its final
+        describe_execution response. Raises the polling error if
+        the execution could not be tracked to the end.
+        """
+        self._done.wait(timeout)
+        if self.exception is not None:
+            raise self.exception
+        return self.description
+
+
+class ExecutionTracker():
+    """
+    Starts Step Functions executions and tracks every in-flight one from
+    a single background worker. Each execution is polled on its own
+    adaptive interval: quickly at first, then backing off towards
+    'max_interval' the longer it runs. With 'track_states' the per-state
+    progress is updated from the new history events on every poll, and the
+    final timings are appended to 'timings_path' as JSON lines.
+    An execution is marked failed after 'max_poll_errors' consecutive
+    polling errors, or at once on a permanent one such as AccessDenied.
+    The worker thread exits when nothing is left to poll.
+    """
+
+    def __init__(
+            self,
+            client: boto3,
+            min_interval: float = 1.0,
+            max_interval: float = 15.0,
+            backoff: float = 1.5,
+            track_states: bool = False,
+            timings_path: str = None,
+            max_poll_errors: int = 5
+        ) -> None:
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.track_states = track_states
+        self.timings_path = timings_path
+        self.max_poll_errors = max_poll_errors
+
+        self._handles = {}
+        self._schedule = {}
+        self._wakeup = threading.Condition()
+        self._worker = None
+
+
+    @instrument()
+    def start(self, command: str, arn: str) -> ExecutionHandle:
+        """
+        Starts an execution of the state machine and returns a handle
+        to it immediately, without waiting for it to finish.
+        """
+        if command not in COMMANDS:
+            raise ValueError(f"Incorrect command. Valid commands: {COMMANDS}")
 
-    commands = ["predict_churn", "match_offers"]
-    if command in commands:
         payload = {
             "run": command
         }
-    else:
-        print(f"Incorrect command. Valid commands: {[c for c in commands]}")
+        response = self.client.start_execution(
+            stateMachineArn = arn,
+            name = f"{payload['run']}_{datetime.now().strftime('%A_%d_+%m_%Y_%H_%M_%S')}_{uuid.uuid4().hex[:8]}",
+            input = json.dumps(payload)
+        )
+        return self.track(response["executionArn"], command, response.get("startDate", datetime.now()))
+
+
+    def track(self, execution_arn: str, command: str = None, started_at: datetime = None) -> ExecutionHandle:
+        """
+        Adds an existing execution to the tracker.
+        """
+        with self._wakeup:
+            if execution_arn not in self._handles:
+                self._handles[execution_arn] = ExecutionHandle(command, execution_arn, started_at or datetime.now())
+                self._schedule[execution_arn] = (time.monotonic(), self.min_interval)
+            self._ensure_worker()
+            self._wakeup.notify()
+            return self._handles[execution_arn]
+
+
+    def get(self, execution_arn: str) -> ExecutionHandle | None:
+        return self._handles.get(execution_arn)
+
+
+    def active(self) -> list[ExecutionHandle]:
+        """
+        Returns all executions that are still running.
+        """
+        return [handle for handle in list(self._handles.values()) if not handle.done]
+
+
+    def _record_timings(self, handle: ExecutionHandle) -> None:
+        """
+        Appends the per-state timings of a finished execution
+        to the local timings file.
+        """
+        stop_date = handle.description.get("stopDate")
+        run = {
+            "command": handle.command,
+            "execution_arn": handle.execution_arn,
+            "status": handle.status,
+            "started_at": handle.started_at.isoformat(),
+            "duration": (stop_date - handle.started_at).total_seconds() if stop_date else handle.elapsed,
+            "states": [
+                {
+                    "state": record["state"],
+                    "type": record["type"],
+                    "start": record["start"].isoformat(),
+                    "end": record["end"].isoformat() if record["end"] else None,
+                    "duration": record["duration"]
+                }
+                for record in handle.states
+            ]
+        }
+        os.makedirs(os.path.dirname(self.timings_path), exist_ok=True)
+        with open(self.timings_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="sf-execution-tracker", daemon=True)
+            self._worker.start()
+
+
+    def _run(self) -> None:
+        while True:
+            with self._wakeup:
+                if not self._schedule:
+                    self._worker = None
+                    return
+                now = time.monotonic()
+                due = [arn for arn, (next_poll, _) in self._schedule.items() if next_poll <= now]
+                if not due:
+                    self._wakeup.wait(min(next_poll for next_poll, _ in self._schedule.values()) - now)
+                    continue
+
+            for execution_arn in due:
+                handle = self._handles[execution_arn]
+                _, interval = self._schedule[execution_arn]
+                try:
+                    desc = self.client.describe_execution(executionArn=execution_arn)
+                    if self.track_states:
+                        events = read_new_events(self.client, execution_arn, handle.last_event_id)
+                        if events:
+                            _apply_state_events(events, handle.states, handle._open_states)
+                            handle.last_event_id = events[-1]["id"]
+                    handle._update(desc)
+                    handle.poll_errors = 0
+                    if handle.done and self.timings_path is not None:
+                        self._record_timings(handle)
+                except Exception as e:
+                    handle.poll_errors += 1
+                    print(f"Error polling {execution_arn}: {e}")
+                    permanent = isinstance(e, ClientError) and e.response["Error"]["Code"] in PERMANENT_ERRORS
+                    if not handle.done and (permanent or handle.poll_errors >= self.max_poll_errors):
+                        handle._fail(e)
+
+                with self._wakeup:
+                    if handle.done:
+                        self._schedule.pop(execution_arn, None)
+                    else:
+                        next_interval = min(self.max_interval, interval * self.backoff)
+                        self._schedule[execution_arn] = (time.monotonic() + interval, next_interval)
+
+
+@instrument()
+def stepfunction_invoke(command: str, client: boto3, arn: str) -> dict[str]:
+    """
+    Invokes an AWS step-functions state-machine to run compute
+    intensitve ECS/Lambda workflows and blocks until it finishes.
+    Prefer ExecutionTracker.start() to keep the caller responsive.
+    """
+    if command not in COMMANDS:
+        print(f"Incorrect command. Valid commands: {[c for c in COMMANDS]}")
         return
-        
-    response = client.start_execution(
-        stateMachineArn = arn,
-        name = f"{payload["run"]}_{datetime.now().strftime("%A_%d_+%m_%Y_%H_%M_%S")}",
-        input = json.dumps(payload)
-    )
-
-    while True:
-        desc = client.describe_execution(executionArn=response["executionArn"])
-        print("Current status:", desc["status"])
-        if desc["status"] != "RUNNING":
-            break
-        time.sleep(5)
-
-        if desc["status"] == "SUCCEEDED":
-            output = json.loads(desc["output"])
-            print("SUCCESS: Workflow succeeded, output:", output)    
-        else:
-            error = desc.get("cause", desc.get("error", "Unknown"))
-            print(f"ERROR: Workflow failed ({desc["status"]}):", error)
-    
-    return desc
+
+    return ExecutionTracker(client).start(command, arn).wait()
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+import streamlit as st
+
+import config as cfg
+
+# Each getter imports its module on first use, so importing this module
+# does not pull boto3, pandas or pyarrow into the app's cold start.
+# The builders below make the same objects without any Streamlit call,
+# so the startup prefetch can run them off the script thread; the
+# cached getters then hand out what the prefetch built.
+
+def _build_auth():
+    from src.utils.aws_utils.auth import LocalAuth
+    auth = LocalAuth(cfg.KEY_PATH, manual_auth=True)
+    auth.warm_up(
+        probes={
+            "s3": lambda client: client.head_bucket(Bucket=cfg.BUCKET),
+            "stepfunctions": lambda client: client.describe_state_machine(stateMachineArn=cfg.SF_ARN)
+        },
+        resources=["dynamodb"]
+    )
+    return auth
+
+def _build_clients(auth) -> dict:
+    return {
+        "sf_client": auth.get_client("stepfunctions"),
+        "s3_client": auth.get_client("s3"),
+        "s3_resource": auth.get_resource("s3"),
+        "dynamo_resource": auth.get_resource("dynamodb"),
+    }
+
+def _build_config_cache(resource):
+    from src.utils.aws_utils.config_cache import ConfigCache
+    return ConfigCache(resource, ttl=cfg.CONFIG_CACHE_TTL)
+
+def _build_exclusion_cache(resource):
+    from src.utils.aws_utils.exclusion_cache import ExclusionCache
+    return ExclusionCache(resource, max_age=cfg.EXCLUSION_CACHE_MAX_AGE)
+
+def _build_s3_cache():
+    from src.utils.aws_utils.s3_cache import S3DiskCache
+    return S3DiskCache(os.path.join(cfg.CACHE_DIR, "s3"), cfg.S3_CACHE_MAX_BYTES)
+
+def _list_offers(client) -> list[dict]:
+    from src.utils.aws_utils.s3_utils import S3Handler
+    objects = S3Handler(cfg.BUCKET, client).list_s3_objects(cfg.OUTPUT_PREFIX)
+    return sorted(
+        [{"key": obj["Key"], "size": obj["Size"], "last_modified": obj["LastModified"]} for obj in objects],
+        key=lambda obj: obj["last_modified"],
+        reverse=True
+    )
+
+def _prefetched(name: str):
+    """
+    Result of a startup prefetch task, or None if it failed.
+    """
+    return get_prefetch().result(name)
+
+@st.cache_resource
+def get_auth():
+    return _prefetched("auth") or _build_auth()
+
+@st.cache_resource
+def get_clients():
+    return _prefetched("clients") or _build_clients(get_auth())
+
+@st.cache_resource
+def get_config_cache(_resource):
+    cache = _prefetched("config")
+    if cache is not None and cache.config.dynamodb is _resource:
+        return cache
+    return _build_config_cache(_resource)
+
+@st.cache_resource
+def get_exclusion_cache(_resource):
+    cache = _prefetched("exclusions")
+    if cache is not None and cache.dynamodb is _resource:
+        return cache
+    return _build_exclusion_cache(_resource)
+
+@st.cache_resource
+def get_s3_cache():
+    return _prefetched("s3_cache") or _build_s3_cache()
+
+@st.cache_resource
+def get_execution_tracker(_client):
+    from src.utils.aws_utils.sf_utils import ExecutionTracker
+    return ExecutionTracker(_client, track_states=True, timings_path=cfg.SF_TIMINGS_PATH)
+
+@st.cache_resource
+def get_result_cache():
+    from src.utils.aws_utils.result_cache import ResultCache
+    return ResultCache(cfg.RESULT_CACHE_PATH, cfg.RESULT_CACHE_MAX_AGE)
+
+@st.cache_data(ttl=cfg.OFFERS_LISTING_TTL, show_spinner=False)
+def get_latest_offers(_client) -> list[dict]:
+    """
+    Listing of the optimized_offers/ objects, newest first. The startup
+    listing is used once, if it is younger than the listing TTL.
+    """
+    prefetch = get_prefetch()
+    offers = prefetch.take("latest_offers")
+    if offers is not None and time.monotonic() - prefetch.started_at < cfg.OFFERS_LISTING_TTL:
+        return offers
+    return _list_offers(_client)
+
+@st.cache_resource
+def get_prefetch():
+    """
+    Starts the startup prefetch once per process. The tasks only use the
+    plain builders above, never Streamlit, as they run without a script
+    context; they share one set of clients built under a lock.
+    """
+    from src.utils.aws_utils.prefetch import StartupPrefetch
+
+    lock = threading.Lock()
+    built = {}
+
+    def clients() -> dict:
+        with lock:
+            if "clients" not in built:
+                built["auth"] = _build_auth()
+                built["clients"] = _build_clients(built["auth"])
+            return built["clients"]
+
+    def auth():
+        clients()
+        return built["auth"]
+
+    def exclusions():
+        cache = _build_exclusion_cache(clients()["dynamo_resource"])
+        cache.refresh()
+        return cache
+
+    def config():
+        cache = _build_config_cache(clients()["dynamo_resource"])
+        cache.values()
+        return cache
+
+    return StartupPrefetch(
+        {
+            "auth": auth,
+            "clients": clients,
+            "s3_cache": _build_s3_cache,
+            "config": config,
+            "exclusions": exclusions,
+            "latest_offers": lambda: _list_offers(clients()["s3_client"]),
+        },
+        max_workers=cfg.PREFETCH_WORKERS
+    )
@@ -0,0 +1,182 @@
+import csv
+import hashlib
+import io
+import streamlit as st
+import pandas as pd
+from typing import Iterator
+import config as cfg
+from src.utils.general_utils.logging import instrument
+
+
+def sa_schema() -> dict:
+    """
+    Expected dtype of every SA output column, from cfg.sa_columns.
+    Columns without an explicit dtype are read as strings.
+    """
+    return {col: cfg.sa_dtypes.get(col, "string") for col in cfg.sa_columns}
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def coerce_column(series: pd.Series, dtype: str) -> pd.Series:
+    """
+    Converts one column to a schema dtype. Values that do not
+    convert become nulls.
+    """
+    if dtype == "datetime" and not pd.api.types.is_datetime64_any_dtype(series):
+        parsed = pd.to_datetime(series, format=cfg.sa_date_formats[0], errors="coerce")
+        for date_format in cfg.sa_date_formats[1:]:
+            missing = parsed.isna() & series.notna()
+            if not missing.any():
+                break
+            parsed[missing] = pd.to_datetime(series[missing], format=date_format, errors="coerce")
+        return parsed
+    if dtype == "float" and not pd.api.types.is_float_dtype(series):
+        return pd.to_numeric(series, errors="coerce").astype("float64")
+    if dtype == "string" and not pd.api.types.is_string_dtype(series):
+        return series.astype("string")
+    return series
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Coerces the SA columns present in the frame to the schema. The number
+    of values lost per column is kept in df.attrs["coercion_failures"]
+    for validation to report.
+    """
+    failures = dict(df.attrs.get("coercion_failures", {}))
+    for col, dtype in sa_schema().items():
+        if col not in df.columns:
+            continue
+        coerced = coerce_column(df[col], dtype)
+        if coerced is not df[col]:
+            lost = int((coerced.isna() & df[col].notna()).sum())
+            if lost:
+                failures[col] = failures.get(col, 0) + lost
+            df[col] = coerced
+    df.attrs["coercion_failures"] = failures
+    return df
+
+
+def csv_columns(data: bytes) -> list:
+    """
+    Column names from the header row of a CSV.
+    """
+    header = data[:data.find(b"\n")] if b"\n" in data else data
+    text = header.decode("utf-8-sig", errors="replace")
+    return [col.strip() for col in next(csv.reader([text]), [])]
+
+
+def _string_types(data: bytes) -> dict:
+    """
+    Arrow types reading every column of a CSV as strings, so columns
+    outside the schema are never type-inferred from the first block.
+    """
+    import pyarrow as pa
+
+    return {col: pa.string() for col in csv_columns(data)}
+
+
+def read_csv_fast(data: bytes) -> pd.DataFrame:
+    """
+    Parses a CSV with the multi-threaded pyarrow reader, typing the SA
+    columns up front. Falls back to an untyped read plus apply_schema
+    when a value does not fit the schema.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    arrow_types = {"datetime": pa.timestamp("s"), "float": pa.float64(), "string": pa.string()}
+    convert_options = pv.ConvertOptions(
+        column_types={
+            **_string_types(data),
+            **{col: arrow_types[dtype] for col, dtype in sa_schema().items()}
+        },
+        timestamp_parsers=cfg.sa_date_formats,
+        strings_can_be_null=True
+    )
+    try:
+        table = pv.read_csv(io.BytesIO(data), convert_options=convert_options)
+    except pa.ArrowInvalid as e:
+        print(f"Typed CSV read failed, coercing instead: {e}")
+        table = pv.read_csv(
+            io.BytesIO(data),
+            convert_options=pv.ConvertOptions(
+                column_types={**_string_types(data), **{col: pa.string() for col in sa_schema()}},
+                strings_can_be_null=True
+            )
+        )
+    return apply_schema(table.to_pandas())
+
+
+def iter_csv_batches(data: bytes, block_size: int = 16 * 1024 ** 2) -> Iterator[pd.DataFrame]:
+    """
+    Streams a CSV as schema-coerced frames of roughly 'block_size'
+    bytes each, so very large files are never held as one frame. All
+    columns are read as strings before coercion, as a type inferred from
+    the first block may not fit a later one.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    reader = pv.open_csv(
+        io.BytesIO(data),
+        read_options=pv.ReadOptions(block_size=block_size),
+        convert_options=pv.ConvertOptions(
+            column_types={**_string_types(data), **{col: pa.string() for col in sa_schema()}},
+            strings_can_be_null=True
+        )
+    )
+    for batch in reader:
+        yield apply_schema(batch.to_pandas())
+
+
+def read_xlsx_fast(data: bytes) -> pd.DataFrame:
+    """
+    Streams the first worksheet row by row in openpyxl's read-only
+    mode, without building the full cell model of the workbook.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame(columns=cfg.sa_columns)
+        header = [str(col).strip() if col is not None else f"Unnamed: {i}" for i, col in enumerate(header)]
+        records = [row for row in rows if any(value is not None for value in row)]
+    finally:
+        workbook.close()
+    return apply_schema(pd.DataFrame.from_records(records, columns=header))
+
+
+@instrument()
+def read_upload(file_name: str, data: bytes) -> pd.DataFrame:
+    """
+    Parses an uploaded SA output with the fastest reader for its format.
+    """
+    name = file_name.lower()
+    if name.endswith(".csv"):
+        return read_csv_fast(data)
+    if name.endswith(".xlsx"):
+        return read_xlsx_fast(data)
+    return apply_schema(pd.read_excel(io.BytesIO(data)))
+
+
+@st.cache_data(max_entries=cfg.UPLOAD_CACHE_ENTRIES, show_spinner="Reading file...")
+def _parse_cached(digest: str, file_name: str, _data: bytes) -> pd.DataFrame:
+    print(f"Parsing {file_name} ({len(_data)} bytes, {digest})")
+    return read_upload(file_name, _data)
+
+
+def load_upload(uploaded_file) -> tuple[pd.DataFrame, str]:
+    """
+    Returns the parsed upload and its content hash. The frame is cached
+    by the hash, so reruns and button clicks reuse the first parse.
+    """
+    data = uploaded_file.getvalue()
+    digest = content_hash(data)
+    return _parse_cached(digest, uploaded_file.name, data), digest
@@ -0,0 +1,26 @@
+import json
+import os
+
+
+def load_json(path: str) -> dict:
+    """
+    Reads a JSON object from disk, starting empty if the file
+    is missing or corrupt.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_json(path: str, data: dict, indent: int = None) -> None:
+    """
+    Writes a JSON object atomically through a temporary file, so an
+    interrupted write never leaves a half-written file behind.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp, path)
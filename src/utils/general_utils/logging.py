@@ -1,6 +1,12 @@
+import bisect
+import inspect
+import json
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from functools import wraps
-from datetime import datetime
+from typing import Callable
 
 logger = logging.getLogger(__name__)
 handler = logging.StreamHandler()
@@ -11,11 +17,210 @@ handler.setFormatter(logging.Formatter(
 logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+METRIC_PREFIX = "eoa"
+
+
+class Metrics():
+    """
+    In-process registry of call metrics. Every instrumented operation keeps
+    success/failure counts, a cumulative wall-time histogram and, when
+    known, a byte total. Export with to_json() or to_prometheus().
+    """
+
+    def __init__(self, buckets: list = LATENCY_BUCKETS) -> None:
+        self.buckets = sorted(buckets)
+        self._ops = {}
+        self._lock = threading.Lock()
+
+
+    def observe(self, name: str, seconds: float, success: bool = True, nbytes: int = None) -> None:
+        """
+        Records one call of 'name'.
+        """
+        with self._lock:
+            op = self._ops.get(name)
+            if op is None:
+                op = self._ops[name] = {
+                    "count": 0,
+                    "success": 0,
+                    "failure": 0,
+                    "seconds_sum": 0.0,
+                    "seconds_max": 0.0,
+                    "bytes": 0,
+                    "buckets": [0] * (len(self.buckets) + 1)
+                }
+            op["count"] += 1
+            op["success" if success else "failure"] += 1
+            op["seconds_sum"] += seconds
+            op["seconds_max"] = max(op["seconds_max"], seconds)
+            op["buckets"][bisect.bisect_left(self.buckets, seconds)] += 1
+            if nbytes:
+                op["bytes"] += nbytes
+
+
+    def _quantile(self, op: dict, q: float) -> float | None:
+        """
+        Estimates a quantile from the histogram (upper bucket bound).
+        """
+        target = q * op["count"]
+        seen = 0
+        for bound, count in zip(self.buckets + [op["seconds_max"]], op["buckets"]):
+            seen += count
+            if count and seen >= target:
+                return min(bound, op["seconds_max"])
+        return None
+
+
+    def to_json(self) -> dict:
+        """
+        Returns a snapshot of every operation, slowest total time first.
+        """
+        with self._lock:
+            ops = {name: dict(op, buckets=list(op["buckets"])) for name, op in self._ops.items()}
+        snapshot = {}
+        for name, op in sorted(ops.items(), key=lambda x: x[1]["seconds_sum"], reverse=True):
+            snapshot[name] = {
+                "count": op["count"],
+                "success": op["success"],
+                "failure": op["failure"],
+                "seconds_total": op["seconds_sum"],
+                "seconds_mean": op["seconds_sum"] / op["count"],
+                "seconds_p50": self._quantile(op, 0.5),
+                "seconds_p95": self._quantile(op, 0.95),
+                "seconds_max": op["seconds_max"],
+                "bytes": op["bytes"],
+                "histogram": {
+                    **{str(bound): count for bound, count in zip(self.buckets, op["buckets"])},
+                    "+Inf": op["buckets"][-1]
+                }
+            }
+        return snapshot
+
+
+    def to_prometheus(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            ops = {name: dict(op, buckets=list(op["buckets"])) for name, op in sorted(self._ops.items())}
+
+        duration = f"{METRIC_PREFIX}_operation_duration_seconds"
+        calls = f"{METRIC_PREFIX}_operation_calls_total"
+        transferred = f"{METRIC_PREFIX}_operation_bytes_total"
+        lines = [
+            f"# HELP {duration} Wall time of instrumented operations.",
+            f"# TYPE {duration} histogram"
+        ]
+        for name, op in ops.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, op["buckets"]):
+                cumulative += count
+                lines.append(f'{duration}_bucket{{operation="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{duration}_bucket{{operation="{name}",le="+Inf"}} {op["count"]}')
+            lines.append(f'{duration}_sum{{operation="{name}"}} {op["seconds_sum"]}')
+            lines.append(f'{duration}_count{{operation="{name}"}} {op["count"]}')
+
+        lines += [f"# HELP {calls} Calls of instrumented operations by outcome.", f"# TYPE {calls} counter"]
+        for name, op in ops.items():
+            lines.append(f'{calls}{{operation="{name}",status="success"}} {op["success"]}')
+            lines.append(f'{calls}{{operation="{name}",status="failure"}} {op["failure"]}')
+
+        lines += [f"# HELP {transferred} Bytes moved by instrumented operations.", f"# TYPE {transferred} counter"]
+        for name, op in ops.items():
+            if op["bytes"]:
+                lines.append(f'{transferred}{{operation="{name}"}} {op["bytes"]}')
+        return "\n".join(lines) + "\n"
+
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+
+    def reset(self) -> None:
+        with self._lock:
+            self._ops = {}
+
+
+    @contextmanager
+    def timer(self, name: str):
+        """
+        Times a block of code, e.g. a page action:
+
+            with metrics.timer("upload_page.download_offers"):
+                ...
+        """
+        start = time.perf_counter()
+        success = False
+        try:
+            yield
+            success = True
+        finally:
+            self.observe(name, time.perf_counter() - start, success)
+
+
+metrics = Metrics()
+
+
+def _count_bytes(bytes_from, result) -> int | None:
+    if bytes_from is None:
+        return None
+    try:
+        if callable(bytes_from):
+            return bytes_from(result)
+        return result[bytes_from]
+    except (KeyError, TypeError, IndexError):
+        return None
+
+
+def instrument(name: str = None, bytes_from: str | Callable = None, log: bool = False):
+    """
+    Records the wall time, outcome and call count of any function or
+    method in 'metrics', under '<module>.<qualname>' unless named.
+    'bytes_from' is a result key (e.g. "bytes") or a callable on the
+    result giving the bytes transferred. Generator functions are timed
+    until they are exhausted or closed.
+    """
+    def decorator(func):
+        metric = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        if inspect.isgeneratorfunction(func):
+            @wraps(func)
+            def gen_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                success = False
+                try:
+                    yield from func(*args, **kwargs)
+                    success = True
+                except GeneratorExit:
+                    success = True
+                    raise
+                finally:
+                    metrics.observe(metric, time.perf_counter() - start, success)
+            return gen_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if log:
+                logger.info(f"Starting {metric}")
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                metrics.observe(metric, time.perf_counter() - start, success=False)
+                raise
+            elapsed = time.perf_counter() - start
+            metrics.observe(metric, elapsed, success=True, nbytes=_count_bytes(bytes_from, result))
+            if log:
+                logger.info(f"Finished {metric} in {elapsed:.2f}s")
+            return result
+        return wrapper
+    return decorator
+
+
 def log_msg(func):
-    @wraps(func)
-    def wrapper(self, *args, **kwargs):
-        now = datetime.now().strftime("%H:%M:%S")
-        logger.info(f"\a⏳ Starting {func.__name__}")
-        result = func(self, *args, **kwargs)
-        return result
-    return wrapper
+    """
+    Logs the start and end of a call and records its metrics.
+    """
+    return instrument(log=True)(func)
@@ -1,33 +1,9 @@
 import streamlit as st
 import pandas as pd
 from datetime import timezone
-import config as cfg
 from src.utils.general_utils.css import overrides_widget_styling
 
 
-def verify_eoa_upload(df):
-    """
-    Checks the correct colmns are in place and
-    creates a mini file overview for user before
-    uploading to S3 for offer matching.
-    """
-    report = {}
-
-    for col in df.columns:
-        if col not in cfg.sa_columns:
-            report["Column Check"] = False
-        else:
-            report["Column Check"] = True
-
-    report["Offers"] = df.shape[0]
-    report["Stations"] = df["Station"].nunique()
-    report["Cycles"] = "".join([c + " / " for c in df["Cycle"].unique()])[:-2]
-    report["Date Range"] = f"{df['OFD Date'].min().strftime("%y-%m-%d")} - {df['OFD Date'].max().strftime("%y-%m-%d")}"
-    report["Avg. Block Lenght"] = df["Duration"].mean()
-
-    return report 
-
-
 def separate_text_input(text, item_length=None):
     try:
         if len(text) == item_length:
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Iterable
+
+from src.utils.general_utils.ingest import coerce_column, sa_schema
+from src.utils.general_utils.logging import instrument
+
+
+class UploadValidator():
+    """
+    Validates an SA upload against the schema from cfg.sa_columns in a
+    single vectorised pass per chunk. Frames can be fed whole or chunk
+    by chunk; only per-column counters, the distinct stations/cycles and
+    one 8-byte hash per row (for duplicates) are kept between chunks.
+    """
+
+    def __init__(self) -> None:
+        self.schema = sa_schema()
+        self.columns = None
+        self.rows = 0
+        self.nulls = {col: 0 for col in self.schema}
+        self.coercion_failures = {col: 0 for col in self.schema}
+        self.stations = set()
+        self.cycles = set()
+        self.date_min = None
+        self.date_max = None
+        self.duration_sum = 0.0
+        self.duration_count = 0
+        self._row_hashes = []
+
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Adds one chunk of the upload to the running checks.
+        """
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        self.rows += len(chunk)
+
+        present = [col for col in self.schema if col in chunk.columns]
+        parsed_failures = chunk.attrs.get("coercion_failures", {})
+
+        typed = {}
+        for col in present:
+            raw = chunk[col]
+            coerced = coerce_column(raw, self.schema[col])
+            lost = parsed_failures.get(col, 0)
+            if coerced is not raw:
+                lost += int((coerced.isna() & raw.notna()).sum())
+            self.coercion_failures[col] += lost
+            self.nulls[col] += int(coerced.isna().sum()) - lost
+            typed[col] = coerced
+
+        if present:
+            hashes = pd.util.hash_pandas_object(pd.DataFrame(typed), index=False).to_numpy()
+            self._row_hashes.append(hashes)
+
+        if "Station" in typed:
+            self.stations.update(typed["Station"].dropna().unique())
+        if "Cycle" in typed:
+            self.cycles.update(typed["Cycle"].dropna().unique())
+        if "OFD Date" in typed:
+            dates = typed["OFD Date"]
+            low, high = dates.min(), dates.max()
+            if pd.notna(low):
+                self.date_min = low if self.date_min is None else min(self.date_min, low)
+                self.date_max = high if self.date_max is None else max(self.date_max, high)
+        if "Duration" in typed:
+            durations = typed["Duration"]
+            self.duration_sum += float(durations.sum())
+            self.duration_count += int(durations.count())
+
+
+    def report(self) -> dict:
+        """
+        Returns the validation result. Missing columns, nulls and values
+        that do not fit the schema are errors; extra columns and
+        duplicate offer rows are warnings.
+        """
+        columns = self.columns or []
+        missing = [col for col in self.schema if col not in columns]
+        extra = [col for col in columns if col not in self.schema]
+
+        duplicates = 0
+        if self._row_hashes:
+            hashes = np.concatenate(self._row_hashes)
+            duplicates = int(len(hashes) - len(np.unique(hashes)))
+
+        nulls = {col: n for col, n in self.nulls.items() if n and col not in missing}
+        coercion_failures = {col: n for col, n in self.coercion_failures.items() if n}
+
+        errors = []
+        if missing:
+            errors.append(f"Missing columns: {missing}")
+        if nulls:
+            errors.append(f"Empty values: {nulls}")
+        if coercion_failures:
+            errors.append(f"Values not matching the expected type: {coercion_failures}")
+        if self.rows == 0:
+            errors.append("The file contains no offers")
+
+        warnings = []
+        if extra:
+            warnings.append(f"Unexpected columns (ignored): {extra}")
+        if duplicates:
+            warnings.append(f"{duplicates} duplicate offer rows")
+
+        date_range = None
+        if self.date_min is not None:
+            date_range = f"{self.date_min.strftime('%y-%m-%d')} - {self.date_max.strftime('%y-%m-%d')}"
+
+        return {
+            "valid": not errors,
+            "errors": errors,
+            "warnings": warnings,
+            "missing_columns": missing,
+            "extra_columns": extra,
+            "nulls": nulls,
+            "coercion_failures": coercion_failures,
+            "duplicates": duplicates,
+            "summary": {
+                "Column Check": not missing and not extra,
+                "Offers": self.rows,
+                "Stations": len(self.stations),
+                "Cycles": " / ".join(sorted(str(c) for c in self.cycles)),
+                "Date Range": date_range,
+                "Avg. Block Lenght": self.duration_sum / self.duration_count if self.duration_count else None
+            }
+        }
+
+
+@instrument()
+def validate_upload(source: pd.DataFrame | Iterable[pd.DataFrame], chunk_rows: int = None) -> dict:
+    """
+    Validates an upload given as one frame, a frame split into
+    'chunk_rows' slices, or an iterable of chunks (e.g. iter_csv_batches).
+    """
+    validator = UploadValidator()
+    if isinstance(source, pd.DataFrame):
+        if chunk_rows:
+            for start in range(0, max(len(source), 1), chunk_rows):
+                chunk = source.iloc[start:start + chunk_rows]
+                chunk.attrs = {} if start else source.attrs
+                validator.update(chunk)
+        else:
+            validator.update(source)
+    else:
+        for chunk in source:
+            validator.update(chunk)
+    return validator.report()
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def validate_cached(digest: str, _df: pd.DataFrame) -> dict:
+    """
+    Validation report of a parsed upload, cached by its content hash.
+    """
+    return validate_upload(_df)
@@ -0,0 +1,34 @@
+import pandas as pd
+
+from src.utils.general_utils.ingest import iter_csv_batches, read_csv_fast
+from src.utils.general_utils.validation import validate_upload
+
+
+def make_csv(rows: int, last_comment: str = "note") -> bytes:
+    lines = ["OFD Date,Station,Wave,Duration,Cycle,Service Type,Comment"]
+    lines += [f"2025-01-06,DXX{i % 7},W{i % 3},{1 + i % 4}.5,C{i % 2},Standard,1" for i in range(rows - 1)]
+    lines.append(f"2025-01-07,DXX1,W1,2.5,C1,Standard,{last_comment}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def test_extra_column_changing_type_after_first_block():
+    data = make_csv(20_000)
+    block_size = 64 * 1024
+    assert len(data) > 4 * block_size
+
+    batches = list(iter_csv_batches(data, block_size=block_size))
+    assert len(batches) > 1
+    assert sum(len(batch) for batch in batches) == 20_000
+    assert batches[-1]["Comment"].iloc[-1] == "note"
+
+    report = validate_upload(iter_csv_batches(data, block_size=block_size))
+    assert report["valid"]
+    assert report["extra_columns"] == ["Comment"]
+
+
+def test_read_csv_fast_keeps_extra_columns_as_strings():
+    df = read_csv_fast(make_csv(5_000))
+    assert len(df) == 5_000
+    assert pd.api.types.is_string_dtype(df["Comment"])
+    assert pd.api.types.is_datetime64_any_dtype(df["OFD Date"])
+    assert df["Duration"].dtype == "float64"
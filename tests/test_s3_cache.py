@@ -0,0 +1,37 @@
+import io
+import os
+
+import pandas as pd
+
+from src.utils.aws_utils.s3_cache import S3DiskCache
+
+
+class FakeS3():
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    def get_object(self, Bucket, Key, **kwargs):
+        return {"Body": io.BytesIO(self.data), "ETag": '"etag-1"'}
+
+
+def test_fetch_returns_frame_when_it_cannot_be_cached(tmp_path):
+    data = ("value\n" + "1\n" * 1000 + "abc\n").encode()
+    mixed = pd.DataFrame({"value": [1] * 1000 + ["abc"]}, dtype=object)
+    cache = S3DiskCache(str(tmp_path))
+
+    df = cache.fetch(FakeS3(data), "bucket", "out/mixed.csv", lambda _: mixed)
+
+    assert len(df) == 1001
+    assert cache.get("bucket", "out/mixed.csv", '"etag-1"') is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_fetch_caches_frame(tmp_path):
+    data = b"a,b\n1,x\n2,y\n"
+    cache = S3DiskCache(str(tmp_path))
+
+    df = cache.fetch(FakeS3(data), "bucket", "out/ok.csv", lambda body: pd.read_csv(io.BytesIO(body)))
+
+    cached = cache.get("bucket", "out/ok.csv", '"etag-1"')
+    assert cached is not None
+    assert cached.equals(df)